@@ -1,16 +1,52 @@
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, request, jsonify, stream_with_context
 from flask_pymongo import PyMongo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 from functools import wraps
-import base64
-import json
-import hashlib
+import jwt
 import secrets
 import string
+from dashboard_stats import compute_dashboard_stats, EMPTY_STATS
+from order_events import order_created, order_status_changed
+from timeseries import parse_query, compute_timeseries, bucket_totals, get_zone
+from daily_rollups import MAX_DAYS as MAX_CHART_DAYS
+from dish_stats import parse_leaderboard_args, top_dishes
+from indexes import ensure_indexes
+from order_queries import order_filter, parse_limit, decode_cursor, fetch_page, SORT as ORDER_SORT
+from response_cache import create_response_cache, TTLCache
+from streaming import stream_format, stream_cursor, BATCH_SIZE as STREAM_BATCH_SIZE
+from image_store import create_image_store, store_image, externalize, image_url, decode_data_url, HASH_PATTERN
+from image_variants import create_variant_worker, parse_variant
+from projections import parse_fields, full_projection
+from menu_import import import_menus, iter_csv_rows, iter_xlsx_rows
+from sync import sync, parse_since, parse_resources, record_deletion
+from etags import bump_versions, current_version, make_etag
+from compression import create_compression
+from cors import create_cors
+from auth import create_token_verifier
+from json_provider import MongoJSONProvider
+from order_export import (parse_export_args, export_body, export_filename, EXPORT_FORMATS,
+                          PROJECTION as EXPORT_PROJECTION, SORT as EXPORT_SORT)
+from bulk_writes import (menu_document, subscription_document, update_fields as allowed_updates,
+                         parse_bulk_body, run_bulk, MENU_FIELDS, SUBSCRIPTION_FIELDS)
 
 app = Flask(__name__)
+app.json = MongoJSONProvider(app)
+# Wrapping wsgi_app rather than app keeps `app` the Flask object Vercel looks for.
+# CORS goes outermost so preflights are answered before anything else runs
+compression = app.wsgi_app = create_compression(app.wsgi_app)
+app.wsgi_app = create_cors(app.wsgi_app)
+response_cache = create_response_cache()
+token_verifier = create_token_verifier()
+
+# Clerk user id -> vendor _id, so handlers that only need the id skip the lookup
+vendor_id_cache = TTLCache(
+    max_entries=int(os.environ.get('VENDOR_CACHE_MAX_ENTRIES', '10000')),
+    ttl=int(os.environ.get('VENDOR_CACHE_TTL_SECONDS', '300'))
+)
 
 # MongoDB configuration
 mongo = None
@@ -25,28 +61,29 @@ try:
 except Exception as e:
     print(f"MongoDB error: {e}")
 
-# CORS Headers Helper
-def add_cors_headers(response):
-    """Add CORS headers to any response"""
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS, HEAD'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin'
-    response.headers['Access-Control-Allow-Credentials'] = 'true'
-    response.headers['Access-Control-Max-Age'] = '3600'
-    return response
+# Index creation is idempotent; set ENSURE_INDEXES=false to leave it to `python indexes.py ensure`
+if mongo and os.environ.get('ENSURE_INDEXES', 'true').lower() != 'false':
+    try:
+        for collection, error in ensure_indexes(mongo.db).items():
+            # vendors fails on duplicates from before the unique index; see `python indexes.py dedupe`
+            print(f"⚠ Index creation failed on {collection}: {error}")
+    except Exception as e:
+        print(f"⚠ Index creation failed: {e}")
 
-# Global OPTIONS handler
-@app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
-@app.route('/<path:path>', methods=['OPTIONS'])
-def handle_options(path):
-    """Handle ALL OPTIONS requests globally"""
-    response = make_response('', 200)
-    return add_cors_headers(response)
+image_store = create_image_store(mongo.db) if mongo else None
+variant_worker = create_variant_worker(mongo.db, image_store) if mongo else None
 
 # After request handler
 @app.after_request
 def after_request(response):
-    return add_cors_headers(response)
+    # Reads that don't go through cached_json get an ETag hashed from the body;
+    # a match still saves the transfer, just not the query
+    if (request.method in ('GET', 'HEAD') and response.status_code == 200
+            and response.mimetype == app.json.mimetype and not response.is_streamed
+            and 'ETag' not in response.headers):
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+    return response
 
 def verify_clerk_token(f):
     @wraps(f)
@@ -59,100 +96,160 @@ def verify_clerk_token(f):
             except IndexError:
                 response = jsonify({'message': 'Invalid token format'})
                 response.status_code = 401
-                return add_cors_headers(response)
+                return response
         
         if not token:
             response = jsonify({'message': 'Token is missing'})
             response.status_code = 401
-            return add_cors_headers(response)
+            return response
+        
+        if token_verifier is None:
+            response = jsonify({'message': 'Authentication is not configured'})
+            response.status_code = 500
+            return response
         
         try:
-            user_id = None
-            try:
-                token_parts = token.split('.')
-                if len(token_parts) == 3:
-                    payload = token_parts[1]
-                    payload += '=' * (4 - len(payload) % 4)
-                    decoded_payload = base64.urlsafe_b64decode(payload)
-                    token_data = json.loads(decoded_payload)
-                    
-                    user_id = (token_data.get('sub') or
-                              token_data.get('user_id') or
-                              token_data.get('userId') or
-                              token_data.get('id'))
-                    
-                    user_email = token_data.get('email') or token_data.get('email_address')
-                    user_name = token_data.get('name') or token_data.get('given_name')
-                    user_picture = token_data.get('picture') or token_data.get('image_url')
-                    
-                    if user_id:
-                        request.clerk_user_info = {
-                            'email': user_email,
-                            'name': user_name,
-                            'picture': user_picture
-                        }
-                    else:
-                        request.clerk_user_info = {}
-            except Exception:
-                pass
-            
-            if not user_id:
-                user_id = hashlib.md5(token.encode()).hexdigest()[:16]
-            
-            if not user_id:
-                user_id = "default_test_user"
-                
-        except Exception:
-            user_id = "error_fallback_user"
+            claims = token_verifier.verify(token)
+        except jwt.InvalidTokenError:
+            response = jsonify({'message': 'Invalid token'})
+            response.status_code = 401
+            return response
+        except Exception as e:
+            # The JWKS could not be fetched; the token may well be fine
+            print(f"Token verification failed: {e}")
+            response = jsonify({'message': 'Could not verify token'})
+            response.status_code = 503
+            return response
+        
+        user_id = claims['sub']
+        request.clerk_user_info = {
+            'email': claims.get('email') or claims.get('email_address'),
+            'name': claims.get('name') or claims.get('given_name'),
+            'picture': claims.get('picture') or claims.get('image_url')
+        }
         
         return f(user_id, *args, **kwargs)
     return decorated
 
-def serialize_doc(doc):
-    if doc is None:
-        return None
-    if isinstance(doc, list):
-        return [serialize_doc(item) for item in doc]
-    if isinstance(doc, dict):
-        if '_id' in doc:
-            doc['_id'] = str(doc['_id'])
-        return doc
-    return doc
-
-def get_or_create_vendor(user_id):
+def get_or_create_vendor(user_id, projection=None):
     if not mongo:
         return None
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        
-        if not vendor:
-            user_info = getattr(request, 'clerk_user_info', {})
-            vendor_data = {
-                'clerk_user_id': user_id,
-                'businessName': user_info.get('name') or 'My Business',
-                'email': user_info.get('email') or f'user_{user_id[:8]}@example.com',
-                'phone': '+91-0000000000',
-                'address': 'Business Address',
-                'profilePicture': user_info.get('picture'),
-                'createdAt': datetime.utcnow(),
-                'updatedAt': datetime.utcnow()
-            }
-            result = mongo.db.vendors.insert_one(vendor_data)
-            vendor_data['_id'] = result.inserted_id
-            vendor = vendor_data
+        user_info = getattr(request, 'clerk_user_info', {})
+        defaults = {
+            'businessName': user_info.get('name') or 'My Business',
+            'email': user_info.get('email') or f'user_{user_id[:8]}@example.com',
+            'phone': '+91-0000000000',
+            'address': 'Business Address',
+            'profilePicture': user_info.get('picture'),
+            'createdAt': datetime.utcnow(),
+            'updatedAt': datetime.utcnow()
+        }
         
+        # One round trip; the unique clerk_user_id index stops concurrent
+        # first requests from creating duplicates
+        try:
+            vendor = mongo.db.vendors.find_one_and_update(
+                {'clerk_user_id': user_id},
+                {'$setOnInsert': defaults},
+                projection=projection,
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost the insert race to a parallel request; its document is there now
+            vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id}, projection)
+        
+        vendor_id_cache.set(user_id, str(vendor['_id']))
         return vendor
     except Exception as e:
         print(f"Error in get_or_create_vendor: {e}")
         return None
 
+def cached_json(vendor_id, scope, build):
+    """Serve a JSON body from the response cache, building it on a miss
+
+    Answers a matching If-None-Match with 304 before build() runs
+    """
+    version = current_version(mongo.db, vendor_id, scope)
+    etag = make_etag(vendor_id, scope, version, request.full_path)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        # Keyed on the same shared version as the ETag, so a write handled by
+        # another worker can never leave a stale body under a fresh tag
+        body = response_cache.get_or_build(vendor_id, scope, request.full_path,
+                                           lambda: app.json.dumps(build()), version)
+        response = app.response_class(body, mimetype=app.json.mimetype)
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def invalidate(vendor_id, *scopes):
+    """Drop cached bodies and ETags for scopes after a write"""
+    response_cache.invalidate(vendor_id, *scopes)
+    # The shared version is what cached_json keys on, so this reaches every worker
+    bump_versions(mongo.db, vendor_id, scopes)
+
+def resolve_vendor_id(user_id, create=False):
+    """Return the vendor id (as stored in vendor_id fields) for a Clerk user"""
+    vendor_id = vendor_id_cache.get(user_id)
+    if vendor_id is not None:
+        return vendor_id
+    
+    if create:
+        vendor = get_or_create_vendor(user_id)
+    else:
+        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id}, {'_id': 1})
+    if not vendor:
+        return None
+    
+    vendor_id = str(vendor['_id'])
+    vendor_id_cache.set(user_id, vendor_id)
+    return vendor_id
+
+def vendor_timezone(vendor_id):
+    """The vendor's IANA timezone name, or None for UTC"""
+    vendor = mongo.db.vendors.find_one({'_id': ObjectId(vendor_id)}, {'timezone': 1})
+    return vendor.get('timezone') if vendor else None
+
+def filter_timezone(vendor_id, args):
+    """The vendor's timezone when from/to need one to be read in, else None"""
+    if not (args.get('from') or args.get('to')):
+        return None
+    return vendor_timezone(vendor_id)
+
 def generate_secure_password(length=12):
     """Generate a cryptographically secure random password"""
     characters = string.ascii_letters + string.digits + string.punctuation
     password = ''.join(secrets.choice(characters) for _ in range(length))
     return password
 
+def prepare_menu_data(data):
+    """Move an inline base64 image into the image store before the menu is written"""
+    if 'imageUrl' in data:
+        data = {**data, 'imageUrl': externalize(image_store, data['imageUrl'], variant_worker.submit)}
+    return data
+
+def bulk_response(user_id, collection, scope, build, allowed, prepare=None):
+    """Shared body of the /bulk endpoints"""
+    vendor_id = resolve_vendor_id(user_id)
+    if not vendor_id:
+        return jsonify({'error': 'Vendor not found'}), 404
+    
+    try:
+        operations, ordered = parse_bulk_body(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    results, summary = run_bulk(collection, vendor_id, operations, ordered, build, allowed, prepare)
+    record_deletion(mongo.db, vendor_id, scope,
+                    [result['_id'] for result in results if result['status'] == 'deleted'])
+    if summary['created'] or summary['updated'] or summary['deleted']:
+        invalidate(vendor_id, scope, 'dashboard')
+    return jsonify({'ordered': ordered, **summary, 'results': results})
+
 # Routes
 @app.route('/')
 @app.route('/api')
@@ -171,6 +268,16 @@ def test_api():
         'timestamp': datetime.utcnow().isoformat()
     })
 
+@app.route('/api/cache/stats', methods=['GET'])
+@verify_clerk_token
+def get_cache_stats(user_id):
+    return jsonify(response_cache.stats())
+
+@app.route('/api/compression/stats', methods=['GET'])
+@verify_clerk_token
+def get_compression_stats(user_id):
+    return jsonify(compression.stats())
+
 @app.route('/api/vendors/me', methods=['GET'])
 @verify_clerk_token
 def get_vendor_profile(user_id):
@@ -178,10 +285,15 @@ def get_vendor_profile(user_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = get_or_create_vendor(user_id)
+        try:
+            projection = parse_fields(request.args, 'vendor')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        vendor = get_or_create_vendor(user_id, projection)
         if not vendor:
             return jsonify({'error': 'Failed to get vendor profile'}), 500
-        return jsonify(serialize_doc(vendor))
+        return jsonify(vendor)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -192,23 +304,34 @@ def update_vendor_profile(user_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
-            return jsonify({'error': 'Vendor not found'}), 404
-        
         data = request.json or {}
         update_fields = {}
-        allowed_fields = ['businessName', 'ownerName', 'email', 'phone', 'address', 'description']
+        allowed_fields = ['businessName', 'ownerName', 'email', 'phone', 'address', 'description', 'timezone']
         
         for field in allowed_fields:
             if field in data:
                 update_fields[field] = data[field]
         
+        if 'timezone' in update_fields:
+            try:
+                get_zone(update_fields['timezone'])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
         update_fields['updatedAt'] = datetime.utcnow()
-        mongo.db.vendors.update_one({'_id': vendor['_id']}, {'$set': update_fields})
+        updated_vendor = mongo.db.vendors.find_one_and_update(
+            {'clerk_user_id': user_id},
+            {'$set': update_fields},
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated_vendor:
+            return jsonify({'error': 'Vendor not found'}), 404
         
-        updated_vendor = mongo.db.vendors.find_one({'_id': vendor['_id']})
-        return jsonify(serialize_doc(updated_vendor))
+        vendor_id = str(updated_vendor['_id'])
+        vendor_id_cache.set(user_id, vendor_id)
+        # Date-filtered order lists are read in the vendor's timezone too
+        invalidate(vendor_id, *(('dashboard', 'orders') if 'timezone' in update_fields else ('dashboard',)))
+        return jsonify(updated_vendor)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -219,23 +342,32 @@ def create_vendor(user_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        existing_vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if existing_vendor:
-            return jsonify(serialize_doc(existing_vendor))
-        
+        data = request.json or {}
         vendor_data = {
-            'clerk_user_id': user_id,
-            'businessName': request.json.get('businessName', 'My Business'),
-            'email': request.json.get('email', ''),
-            'phone': request.json.get('phone', ''),
-            'address': request.json.get('address', ''),
+            'businessName': data.get('businessName', 'My Business'),
+            'email': data.get('email', ''),
+            'phone': data.get('phone', ''),
+            'address': data.get('address', ''),
             'createdAt': datetime.utcnow(),
             'updatedAt': datetime.utcnow()
         }
         
-        result = mongo.db.vendors.insert_one(vendor_data)
-        vendor_data['_id'] = result.inserted_id
-        return jsonify(serialize_doc(vendor_data)), 201
+        try:
+            result = mongo.db.vendors.update_one(
+                {'clerk_user_id': user_id},
+                {'$setOnInsert': vendor_data},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            result = None
+        vendor_id_cache.delete(user_id)
+        
+        if result is None or result.upserted_id is None:
+            existing_vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
+            return jsonify(existing_vendor)
+        
+        vendor_data.update({'_id': result.upserted_id, 'clerk_user_id': user_id})
+        return jsonify(vendor_data), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -246,13 +378,21 @@ def list_subscriptions(user_id):
         return jsonify([])
     
     try:
-        vendor = get_or_create_vendor(user_id)
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id, create=True)
+        if not vendor_id:
             return jsonify([])
         
-        vendor_id = str(vendor['_id'])
-        subs = list(mongo.db.subscriptions.find({'vendor_id': vendor_id}))
-        return jsonify(serialize_doc(subs))
+        try:
+            projection = parse_fields(request.args, 'subscriptions')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        fmt = stream_format(request)
+        if fmt:
+            return stream_cursor(app, mongo.db.subscriptions.find({'vendor_id': vendor_id}, projection), fmt)
+        
+        return cached_json(vendor_id, 'subscriptions', lambda: list(
+            mongo.db.subscriptions.find({'vendor_id': vendor_id}, projection)))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -263,27 +403,18 @@ def create_subscription(user_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
-        data = request.json or {}
-        sub = {
-            'vendor_id': str(vendor['_id']),
-            'planName': data.get('planName', ''),
-            'description': data.get('description', ''),
-            'price': float(data.get('price', 0)) if str(data.get('price', '')).strip() != '' else 0,
-            'duration': data.get('duration', 'monthly'),
-            'features': data.get('features', []),
-            'isActive': bool(data.get('isActive', True)),
-            'subscriberCount': 0,
-            'createdAt': datetime.utcnow(),
-            'updatedAt': datetime.utcnow()
-        }
+        sub = subscription_document(vendor_id, request.json or {})
         
         res = mongo.db.subscriptions.insert_one(sub)
         sub['_id'] = res.inserted_id
-        return jsonify(serialize_doc(sub)), 201
+        invalidate(vendor_id, 'subscriptions', 'dashboard')
+        return jsonify(sub), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -294,31 +425,24 @@ def update_subscription(user_id, subscription_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         sub_obj_id = ObjectId(subscription_id)
-        data = request.json or {}
+        update_fields = allowed_updates(request.json or {}, SUBSCRIPTION_FIELDS)
         
-        update_fields = {}
-        allowed_fields = ['planName', 'description', 'price', 'duration', 'features', 'isActive']
-        for field in allowed_fields:
-            if field in data:
-                update_fields[field] = data[field]
-        
-        update_fields['updatedAt'] = datetime.utcnow()
-        
-        result = mongo.db.subscriptions.update_one(
-            {'_id': sub_obj_id, 'vendor_id': str(vendor['_id'])},
-            {'$set': update_fields}
+        # One round trip; a vendor_id mismatch looks the same as a missing document
+        updated_sub = mongo.db.subscriptions.find_one_and_update(
+            {'_id': sub_obj_id, 'vendor_id': vendor_id},
+            {'$set': update_fields},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count == 0:
+        if not updated_sub:
             return jsonify({'error': 'Subscription not found'}), 404
-        
-        updated_sub = mongo.db.subscriptions.find_one({'_id': sub_obj_id})
-        return jsonify(serialize_doc(updated_sub))
+        invalidate(vendor_id, 'subscriptions', 'dashboard')
+        return jsonify(updated_sub)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -329,24 +453,38 @@ def delete_subscription(user_id, subscription_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         sub_obj_id = ObjectId(subscription_id)
         
         result = mongo.db.subscriptions.delete_one({
             '_id': sub_obj_id,
-            'vendor_id': str(vendor['_id'])
+            'vendor_id': vendor_id
         })
         
         if result.deleted_count == 0:
             return jsonify({'error': 'Subscription not found'}), 404
+        record_deletion(mongo.db, vendor_id, 'subscriptions', [sub_obj_id])
+        invalidate(vendor_id, 'subscriptions', 'dashboard')
         
         return jsonify({'message': 'Subscription deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/subscriptions/bulk', methods=['POST'])
+@verify_clerk_token
+def bulk_subscriptions(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        return bulk_response(user_id, mongo.db.subscriptions, 'subscriptions',
+                             subscription_document, SUBSCRIPTION_FIELDS)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/menus', methods=['GET'])
 @verify_clerk_token
 def get_menus(user_id):
@@ -354,12 +492,21 @@ def get_menus(user_id):
         return jsonify([])
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify([])
         
-        menus = list(mongo.db.menus.find({'vendor_id': str(vendor['_id'])}))
-        return jsonify(serialize_doc(menus))
+        try:
+            projection = parse_fields(request.args, 'menus')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        fmt = stream_format(request)
+        if fmt:
+            return stream_cursor(app, mongo.db.menus.find({'vendor_id': vendor_id}, projection), fmt)
+        
+        return cached_json(vendor_id, 'menus', lambda: list(
+            mongo.db.menus.find({'vendor_id': vendor_id}, projection)))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -370,29 +517,18 @@ def create_menu(user_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
-        menu_data = {
-            'vendor_id': str(vendor['_id']),
-            'name': request.json.get('name', ''),
-            'description': request.json.get('description', ''),
-            'price': request.json.get('price', 0),
-            'category': request.json.get('category', ''),
-            'mealType': request.json.get('mealType', 'breakfast'),
-            'availability': request.json.get('availability', 'daily'),
-            'startDate': request.json.get('startDate', ''),
-            'endDate': request.json.get('endDate', ''),
-            'isPublished': bool(request.json.get('isPublished', False)),
-            'imageUrl': request.json.get('imageUrl', ''),
-            'createdAt': datetime.utcnow(),
-            'updatedAt': datetime.utcnow()
-        }
+        menu_data = menu_document(vendor_id, prepare_menu_data(request.json or {}))
         
         result = mongo.db.menus.insert_one(menu_data)
         menu_data['_id'] = result.inserted_id
-        return jsonify(serialize_doc(menu_data)), 201
+        invalidate(vendor_id, 'menus', 'dashboard')
+        return jsonify(menu_data), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -403,32 +539,25 @@ def update_menu(user_id, menu_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         menu_obj_id = ObjectId(menu_id)
-        data = request.json or {}
-        
-        update_fields = {}
-        allowed_fields = ['name', 'description', 'price', 'category', 'mealType', 'availability', 
-                         'startDate', 'endDate', 'isPublished', 'imageUrl']
-        for field in allowed_fields:
-            if field in data:
-                update_fields[field] = data[field]
-        
-        update_fields['updatedAt'] = datetime.utcnow()
+        update_fields = allowed_updates(prepare_menu_data(request.json or {}), MENU_FIELDS)
         
-        result = mongo.db.menus.update_one(
-            {'_id': menu_obj_id, 'vendor_id': str(vendor['_id'])},
-            {'$set': update_fields}
+        updated_menu = mongo.db.menus.find_one_and_update(
+            {'_id': menu_obj_id, 'vendor_id': vendor_id},
+            {'$set': update_fields},
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count == 0:
+        if not updated_menu:
             return jsonify({'error': 'Menu not found'}), 404
-        
-        updated_menu = mongo.db.menus.find_one({'_id': menu_obj_id})
-        return jsonify(serialize_doc(updated_menu))
+        invalidate(vendor_id, 'menus', 'dashboard')
+        return jsonify(updated_menu)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -439,124 +568,321 @@ def delete_menu(user_id, menu_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         menu_obj_id = ObjectId(menu_id)
         
         result = mongo.db.menus.delete_one({
             '_id': menu_obj_id,
-            'vendor_id': str(vendor['_id'])
+            'vendor_id': vendor_id
         })
         
         if result.deleted_count == 0:
             return jsonify({'error': 'Menu not found'}), 404
+        record_deletion(mongo.db, vendor_id, 'menus', [menu_obj_id])
+        invalidate(vendor_id, 'menus', 'dashboard')
         
         return jsonify({'message': 'Menu deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/menus/bulk', methods=['POST'])
+@verify_clerk_token
+def bulk_menus(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        return bulk_response(user_id, mongo.db.menus, 'menus', menu_document, MENU_FIELDS,
+                             prepare_menu_data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/menus/import', methods=['POST'])
+@verify_clerk_token
+def import_menu_file(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
+            return jsonify({'error': 'Vendor not found'}), 404
+        
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'Upload the CSV or XLSX as the "file" form field'}), 400
+        
+        # Werkzeug spools large uploads to disk, so rows are read from a file, not memory
+        file_format = request.args.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+        if file_format == 'xlsx':
+            rows = iter_xlsx_rows(upload.stream)
+        elif file_format == 'csv':
+            rows = iter_csv_rows(upload.stream)
+        else:
+            return jsonify({'error': 'Only .csv and .xlsx files can be imported'}), 400
+        
+        try:
+            report = import_menus(mongo.db.menus, vendor_id, rows, prepare=prepare_menu_data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if report['imported']:
+            invalidate(vendor_id, 'menus', 'dashboard')
+        return jsonify(report), 201 if report['imported'] else 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/images', methods=['POST'])
+@verify_clerk_token
+def upload_image(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        # Multipart file upload, or JSON {"imageUrl": "data:image/...;base64,..."}
+        if 'image' in request.files:
+            data = request.files['image'].read()
+        else:
+            data = decode_data_url((request.get_json(silent=True) or {}).get('imageUrl', ''))
+        digest = store_image(image_store, data, variant_worker.submit)
+        return jsonify({'hash': digest, 'imageUrl': image_url(digest)}), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Public so <img> tags can load it; the hash is the only handle on an image
+@app.route('/api/images/<digest>', methods=['GET'])
+def get_image(digest):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    if not HASH_PATTERN.match(digest):
+        return jsonify({'error': 'Image not found'}), 404
+    
+    try:
+        variant = parse_variant(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        served = digest
+        cache_control = 'public, max-age=31536000, immutable'
+        if variant:
+            variants = variant_worker.lookup(digest)
+            if variants is None:
+                # Not rendered yet: queue it (if there is anything to render) and serve the original
+                if not image_store.exists(digest):
+                    return jsonify({'error': 'Image not found'}), 404
+                variant_worker.submit(digest)
+                cache_control = 'public, max-age=60'
+            elif variant in variants:
+                served = variants[variant]
+            else:
+                # Rendering failed; the original is all there is
+                cache_control = 'public, max-age=3600'
+        
+        # Content never changes for a hash, so a matching ETag needs no read
+        if served in request.if_none_match:
+            response = app.response_class(status=304)
+        else:
+            stored = image_store.get(served)
+            if stored is None:
+                return jsonify({'error': 'Image not found'}), 404
+            data, content_type = stored
+            response = app.response_class(data, mimetype=content_type)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    response.set_etag(served)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
 @app.route('/api/orders', methods=['GET'])
 @verify_clerk_token
 def get_orders(user_id):
     if not mongo:
-        return jsonify([])
+        return jsonify({'orders': [], 'nextCursor': None})
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
-            return jsonify([])
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
+            return jsonify({'orders': [], 'nextCursor': None})
         
-        orders = list(mongo.db.orders.find({'vendor_id': str(vendor['_id'])}))
-        return jsonify(serialize_doc(orders))
+        try:
+            query = order_filter(vendor_id, request.args, filter_timezone(vendor_id, request.args))
+            limit = parse_limit(request.args)
+            cursor = request.args.get('cursor')
+            if cursor:
+                decode_cursor(cursor)
+            # The next-page cursor is built from createdAt, so it is always fetched
+            projection = parse_fields(request.args, 'orders', required=('createdAt',))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Streaming is for exports: every matching order, newest first, no pages
+        fmt = stream_format(request)
+        if fmt:
+            return stream_cursor(app, mongo.db.orders.find(query, projection).sort(ORDER_SORT), fmt)
+        
+        def build():
+            orders, next_cursor = fetch_page(mongo.db.orders, query, limit, cursor, projection)
+            return {'orders': orders, 'nextCursor': next_cursor}
+        
+        return cached_json(vendor_id, 'orders', build)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/dashboard/stats', methods=['GET'])
+@app.route('/api/orders/export', methods=['GET'])
 @verify_clerk_token
-def get_dashboard_stats(user_id):
+def export_orders(user_id):
     if not mongo:
-        return jsonify({
-            'totalOrders': 0, 'totalRevenue': 0, 'totalMenuItems': 0,
-            'totalCustomers': 0, 'activeSubscriptions': 0, 'deliveryStaff': 0,
-            'todayRevenue': 0, 'todayOrders': 0, 'pendingOrders': 0, 'completedOrders': 0
-        })
+        return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = get_or_create_vendor(user_id)
-        if not vendor:
-            return jsonify({
-                'totalOrders': 0, 'totalRevenue': 0, 'totalMenuItems': 0,
-                'totalCustomers': 0, 'activeSubscriptions': 0, 'deliveryStaff': 0,
-                'todayRevenue': 0, 'todayOrders': 0, 'pendingOrders': 0, 'completedOrders': 0
-            })
-        
-        vendor_id = str(vendor['_id'])
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-        
-        total_orders = mongo.db.orders.count_documents({'vendor_id': vendor_id})
-        total_menus = mongo.db.menus.count_documents({'vendor_id': vendor_id})
-        
-        total_revenue_pipeline = [
-            {'$match': {'vendor_id': vendor_id}},
-            {'$group': {'_id': None, 'total': {'$sum': '$totalAmount'}}}
-        ]
-        total_revenue_result = list(mongo.db.orders.aggregate(total_revenue_pipeline))
-        total_revenue = total_revenue_result[0]['total'] if total_revenue_result else 0
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
+            return jsonify({'error': 'Vendor not found'}), 404
         
-        unique_customers = len(mongo.db.orders.distinct('customerEmail', {'vendor_id': vendor_id}))
+        try:
+            export_format, compress = parse_export_args(request.args)
+            query = order_filter(vendor_id, request.args, filter_timezone(vendor_id, request.args))
+            orders = mongo.db.orders.find(query, EXPORT_PROJECTION).sort(EXPORT_SORT)
+            body = export_body(orders.batch_size(STREAM_BATCH_SIZE), export_format, compress)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        mimetype = 'application/gzip' if compress else EXPORT_FORMATS[export_format][0]
+        response = app.response_class(stream_with_context(body), mimetype=mimetype)
+        filename = export_filename(request.args, export_format, compress)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders', methods=['POST'])
+@verify_clerk_token
+def create_order(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
+            return jsonify({'error': 'Vendor not found'}), 404
         
-        active_subscriptions_pipeline = [
-            {'$match': {'vendor_id': vendor_id}},
-            {'$group': {'_id': None, 'total': {'$sum': '$subscriberCount'}}}
+        data = request.json or {}
+        items = [
+            {
+                'name': item.get('name', ''),
+                'price': float(item.get('price', 0) or 0),
+                'quantity': int(item.get('quantity', 1) or 1)
+            }
+            for item in data.get('items', [])
         ]
-        active_subs_result = list(mongo.db.subscriptions.aggregate(active_subscriptions_pipeline))
-        active_subscriptions = active_subs_result[0]['total'] if active_subs_result else 0
         
-        delivery_staff_count = mongo.db.delivery_staff.count_documents({'vendor_id': vendor_id})
+        order_data = {
+            'vendor_id': vendor_id,
+            'customerName': data.get('customerName', ''),
+            'customerPhone': data.get('customerPhone', ''),
+            'customerEmail': data.get('customerEmail', ''),
+            'items': items,
+            'totalAmount': sum(item['price'] * item['quantity'] for item in items),
+            'status': data.get('status', 'pending'),
+            'deliveryAddress': data.get('deliveryAddress', ''),
+            'createdAt': datetime.utcnow(),
+            'updatedAt': datetime.utcnow()
+        }
         
-        today_revenue_pipeline = [
-            {'$match': {
-                'vendor_id': vendor_id,
-                'createdAt': {'$gte': today_start, '$lt': today_end}
-            }},
-            {'$group': {'_id': None, 'total': {'$sum': '$totalAmount'}}}
-        ]
-        today_revenue_result = list(mongo.db.orders.aggregate(today_revenue_pipeline))
-        today_revenue = today_revenue_result[0]['total'] if today_revenue_result else 0
+        result = mongo.db.orders.insert_one(order_data)
+        order_data['_id'] = result.inserted_id
+        order_created(mongo.db, order_data)
+        invalidate(vendor_id, 'orders', 'dashboard')
+        return jsonify(order_data), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/orders/<order_id>', methods=['PUT'])
+@verify_clerk_token
+def update_order_status(user_id, order_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
+            return jsonify({'error': 'Vendor not found'}), 404
         
-        today_orders = mongo.db.orders.count_documents({
-            'vendor_id': vendor_id,
-            'createdAt': {'$gte': today_start, '$lt': today_end}
-        })
+        data = request.json or {}
+        if not data.get('status'):
+            return jsonify({'error': 'status is required'}), 400
         
-        pending_orders = mongo.db.orders.count_documents({
-            'vendor_id': vendor_id,
-            'status': {'$in': ['pending', 'confirmed', 'preparing', 'ready', 'out_for_delivery']}
-        })
+        # The pre-image tells us which status counter to move the order out of
+        previous = mongo.db.orders.find_one_and_update(
+            {'_id': ObjectId(order_id), 'vendor_id': vendor_id},
+            {'$set': {'status': data['status'], 'updatedAt': datetime.utcnow()}}
+        )
+        if not previous:
+            return jsonify({'error': 'Order not found'}), 404
         
-        completed_orders = mongo.db.orders.count_documents({
-            'vendor_id': vendor_id,
-            'status': 'delivered'
-        })
+        updated_order = {**previous, 'status': data['status']}
+        order_status_changed(mongo.db, updated_order, previous.get('status'))
+        invalidate(vendor_id, 'orders', 'dashboard')
+        return jsonify(updated_order)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/sync', methods=['GET'])
+@verify_clerk_token
+def sync_changes(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
+            return jsonify({'error': 'Vendor not found'}), 404
         
-        return jsonify({
-            'totalOrders': total_orders,
-            'totalRevenue': round(total_revenue, 2),
-            'totalMenuItems': total_menus,
-            'totalCustomers': unique_customers,
-            'activeSubscriptions': active_subscriptions,
-            'deliveryStaff': delivery_staff_count,
-            'todayRevenue': round(today_revenue, 2),
-            'todayOrders': today_orders,
-            'pendingOrders': pending_orders,
-            'completedOrders': completed_orders
-        })
+        try:
+            since = parse_since(request.args.get('since'))
+            resources = parse_resources(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(sync(mongo.db, vendor_id, resources, since))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/dashboard/stats', methods=['GET'])
+@verify_clerk_token
+def get_dashboard_stats(user_id):
+    if not mongo:
+        return jsonify(EMPTY_STATS)
+    
+    try:
+        vendor_id = resolve_vendor_id(user_id, create=True)
+        if not vendor_id:
+            return jsonify(EMPTY_STATS)
+        
+        exact = request.args.get('exact') in ('1', 'true')
+        return cached_json(vendor_id, 'dashboard', lambda: compute_dashboard_stats(
+            mongo.db, vendor_id, exact_customers=exact, timezone_name=vendor_timezone(vendor_id)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def daily_chart(vendor, *metrics):
+    """Daily buckets of metrics in the vendor's timezone, keyed by local date"""
+    args = request.args.to_dict()
+    args.update({'metric': metrics[0], 'granularity': 'day'})
+    query = parse_query(args, vendor.get('timezone'))
+    if (query['end'].date() - query['start'].date()).days + 1 > MAX_CHART_DAYS:
+        raise ValueError(f'Date range cannot exceed {MAX_CHART_DAYS} days')
+    _, series = bucket_totals(mongo.db, str(vendor['_id']), query, metrics)
+    return [{'date': bucket.date().isoformat(), **values} for bucket, values in series]
+
 @app.route('/api/dashboard/revenue', methods=['GET'])
 @verify_clerk_token
 def get_dashboard_revenue(user_id):
@@ -568,52 +894,10 @@ def get_dashboard_revenue(user_id):
         if not vendor:
             return jsonify([])
         
-        vendor_id = str(vendor['_id'])
-        end_date = datetime.now().replace(hour=23, minute=59, second=59, microsecond=999999)
-        start_date = end_date - timedelta(days=6)
-        
-        revenue_pipeline = [
-            {
-                '$match': {
-                    'vendor_id': vendor_id,
-                    'createdAt': {'$gte': start_date, '$lte': end_date}
-                }
-            },
-            {
-                '$group': {
-                    '_id': {
-                        'year': {'$year': '$createdAt'},
-                        'month': {'$month': '$createdAt'},
-                        'day': {'$dayOfMonth': '$createdAt'}
-                    },
-                    'revenue': {'$sum': '$totalAmount'}
-                }
-            },
-            {
-                '$sort': {'_id': 1}
-            }
-        ]
-        
-        revenue_results = list(mongo.db.orders.aggregate(revenue_pipeline))
-        
-        revenue_data = []
-        for i in range(7):
-            current_date = start_date + timedelta(days=i)
-            date_str = current_date.strftime('%Y-%m-%d')
-            day_revenue = 0
-            
-            for result in revenue_results:
-                result_date = datetime(result['_id']['year'], result['_id']['month'], result['_id']['day'])
-                if result_date.date() == current_date.date():
-                    day_revenue = result['revenue']
-                    break
-            
-            revenue_data.append({
-                'date': date_str,
-                'revenue': round(day_revenue, 2)
-            })
-        
-        return jsonify(revenue_data)
+        try:
+            return cached_json(str(vendor['_id']), 'dashboard', lambda: daily_chart(vendor, 'revenue'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -628,52 +912,30 @@ def get_dashboard_orders(user_id):
         if not vendor:
             return jsonify([])
         
-        vendor_id = str(vendor['_id'])
-        end_date = datetime.now().replace(hour=23, minute=59, second=59, microsecond=999999)
-        start_date = end_date - timedelta(days=6)
-        
-        orders_pipeline = [
-            {
-                '$match': {
-                    'vendor_id': vendor_id,
-                    'createdAt': {'$gte': start_date, '$lte': end_date}
-                }
-            },
-            {
-                '$group': {
-                    '_id': {
-                        'year': {'$year': '$createdAt'},
-                        'month': {'$month': '$createdAt'},
-                        'day': {'$dayOfMonth': '$createdAt'}
-                    },
-                    'orders': {'$sum': 1}
-                }
-            },
-            {
-                '$sort': {'_id': 1}
-            }
-        ]
+        try:
+            return cached_json(str(vendor['_id']), 'dashboard', lambda: daily_chart(vendor, 'orders', 'items'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/dashboard/timeseries', methods=['GET'])
+@verify_clerk_token
+def get_dashboard_timeseries(user_id):
+    if not mongo:
+        return jsonify({'error': 'Database not connected'}), 500
+    
+    try:
+        vendor = get_or_create_vendor(user_id)
+        if not vendor:
+            return jsonify({'error': 'Vendor not found'}), 404
         
-        orders_results = list(mongo.db.orders.aggregate(orders_pipeline))
-        
-        orders_data = []
-        for i in range(7):
-            current_date = start_date + timedelta(days=i)
-            date_str = current_date.strftime('%Y-%m-%d')
-            day_orders = 0
-            
-            for result in orders_results:
-                result_date = datetime(result['_id']['year'], result['_id']['month'], result['_id']['day'])
-                if result_date.date() == current_date.date():
-                    day_orders = result['orders']
-                    break
-            
-            orders_data.append({
-                'date': date_str,
-                'orders': day_orders
-            })
-        
-        return jsonify(orders_data)
+        try:
+            query = parse_query(request.args, vendor.get('timezone'))
+            vendor_id = str(vendor['_id'])
+            return cached_json(vendor_id, 'dashboard', lambda: compute_timeseries(mongo.db, vendor_id, query))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -684,48 +946,16 @@ def get_popular_dishes(user_id):
         return jsonify([])
     
     try:
-        vendor = get_or_create_vendor(user_id)
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id, create=True)
+        if not vendor_id:
             return jsonify([])
         
-        vendor_id = str(vendor['_id'])
-        
-        popular_dishes_pipeline = [
-            {
-                '$match': {'vendor_id': vendor_id}
-            },
-            {
-                '$unwind': '$items'
-            },
-            {
-                '$group': {
-                    '_id': '$items.name',
-                    'orders': {'$sum': '$items.quantity'},
-                    'revenue': {'$sum': {'$multiply': ['$items.price', '$items.quantity']}},
-                    'price': {'$first': '$items.price'}
-                }
-            },
-            {
-                '$sort': {'orders': -1}
-            },
-            {
-                '$limit': 5
-            }
-        ]
-        
-        popular_dishes_results = list(mongo.db.orders.aggregate(popular_dishes_pipeline))
-        
-        popular_dishes = []
-        for i, dish in enumerate(popular_dishes_results):
-            popular_dishes.append({
-                '_id': str(i + 1),
-                'name': dish['_id'],
-                'orders': dish['orders'],
-                'revenue': round(dish['revenue'], 2),
-                'price': round(dish['price'], 2)
-            })
+        try:
+            limit, window = parse_leaderboard_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify(popular_dishes)
+        return cached_json(vendor_id, 'dashboard', lambda: top_dishes(mongo.db, vendor_id, limit, window))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -736,12 +966,17 @@ def get_delivery_staff(user_id):
         return jsonify([])
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify([])
         
-        staff = list(mongo.db.delivery_staff.find({'vendor_id': str(vendor['_id'])}))
-        return jsonify(serialize_doc(staff))
+        try:
+            projection = parse_fields(request.args, 'staff')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return cached_json(vendor_id, 'staff', lambda: list(
+            mongo.db.delivery_staff.find({'vendor_id': vendor_id}, projection)))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -752,15 +987,15 @@ def create_delivery_staff(user_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         # Auto-generate secure password
         auto_password = generate_secure_password(12)
         
         staff_data = {
-            'vendor_id': str(vendor['_id']),
+            'vendor_id': vendor_id,
             'name': request.json.get('name', ''),
             'phone': request.json.get('phone', ''),
             'email': request.json.get('email', ''),
@@ -774,8 +1009,9 @@ def create_delivery_staff(user_id):
         
         result = mongo.db.delivery_staff.insert_one(staff_data)
         staff_data['_id'] = result.inserted_id
+        invalidate(vendor_id, 'staff', 'dashboard')
         
-        return jsonify(serialize_doc(staff_data)), 201
+        return jsonify(staff_data), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -786,8 +1022,8 @@ def update_delivery_staff(user_id, staff_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         staff_obj_id = ObjectId(staff_id)
@@ -801,16 +1037,17 @@ def update_delivery_staff(user_id, staff_id):
         
         update_fields['updatedAt'] = datetime.utcnow()
         
-        result = mongo.db.delivery_staff.update_one(
-            {'_id': staff_obj_id, 'vendor_id': str(vendor['_id'])},
-            {'$set': update_fields}
+        updated_staff = mongo.db.delivery_staff.find_one_and_update(
+            {'_id': staff_obj_id, 'vendor_id': vendor_id},
+            {'$set': update_fields},
+            projection=full_projection('staff'),
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count == 0:
+        if not updated_staff:
             return jsonify({'error': 'Staff member not found'}), 404
-        
-        updated_staff = mongo.db.delivery_staff.find_one({'_id': staff_obj_id})
-        return jsonify(serialize_doc(updated_staff))
+        invalidate(vendor_id, 'staff', 'dashboard')
+        return jsonify(updated_staff)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -821,19 +1058,21 @@ def delete_delivery_staff(user_id, staff_id):
         return jsonify({'error': 'Database not connected'}), 500
     
     try:
-        vendor = mongo.db.vendors.find_one({'clerk_user_id': user_id})
-        if not vendor:
+        vendor_id = resolve_vendor_id(user_id)
+        if not vendor_id:
             return jsonify({'error': 'Vendor not found'}), 404
         
         staff_obj_id = ObjectId(staff_id)
         
         result = mongo.db.delivery_staff.delete_one({
             '_id': staff_obj_id,
-            'vendor_id': str(vendor['_id'])
+            'vendor_id': vendor_id
         })
         
         if result.deleted_count == 0:
             return jsonify({'error': 'Staff member not found'}), 404
+        record_deletion(mongo.db, vendor_id, 'staff', [staff_obj_id])
+        invalidate(vendor_id, 'staff', 'dashboard')
         
         return jsonify({'message': 'Staff member deleted successfully'})
     except Exception as e:
@@ -0,0 +1,121 @@
+"""
+Clerk session token verification for the Vendor Operations Dashboard
+Checks the RS256 signature, expiry and (when configured) issuer and
+authorized party of every bearer token. Signing keys come from Clerk's JWKS,
+fetched once and cached; a token signed with a key id the cache has not seen
+triggers a refetch, so key rotation needs no restart. Tokens that already
+passed are remembered by hash until they expire, so repeat requests skip
+the signature check
+
+Configuration (environment):
+    CLERK_SECRET_KEY          used to fetch the JWKS from the Clerk Backend API
+    CLERK_JWKS_URL            fetch the JWKS from this URL instead, e.g. the instance's
+                              https://<frontend-api>/.well-known/jwks.json
+    CLERK_ISSUER              required iss claim (optional)
+    CLERK_AUTHORIZED_PARTIES  comma-separated origins accepted in azp (optional)
+    JWKS_CACHE_SECONDS        how long fetched keys are trusted, default 3600
+    TOKEN_CACHE_MAX_ENTRIES   verified tokens remembered, default 10000
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+import jwt
+import requests
+
+from response_cache import TTLCache
+
+CLERK_JWKS_API = 'https://api.clerk.com/v1/jwks'
+ALGORITHMS = ['RS256']
+LEEWAY_SECONDS = 5
+# Unknown key ids come from the client, so they may not force a fetch more often than this
+MIN_REFRESH_SECONDS = 30
+
+class JWKSCache:
+    """Signing keys by kid, refetched when stale or when an unknown kid shows up"""
+
+    def __init__(self, fetch, ttl=3600, min_refresh=MIN_REFRESH_SECONDS):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self._keys = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        keys = {}
+        for jwk in self.fetch().get('keys', []):
+            if jwk.get('kid') and jwk.get('kty') == 'RSA':
+                keys[jwk['kid']] = jwt.PyJWK(jwk, algorithm='RS256').key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def key(self, kid):
+        with self._lock:
+            age = None if self._fetched_at is None else time.monotonic() - self._fetched_at
+            if age is None or age >= self.ttl or (kid not in self._keys and age >= self.min_refresh):
+                try:
+                    self._refresh()
+                except Exception:
+                    if not self._keys:
+                        raise
+                    # Keep serving the keys we have and retry after min_refresh
+                    self._fetched_at = time.monotonic() - self.ttl + self.min_refresh
+            key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f'Unknown signing key {kid}')
+        return key
+
+class TokenVerifier:
+    """Verify bearer tokens and return their claims"""
+
+    def __init__(self, jwks, issuer=None, authorized_parties=None, max_entries=10000):
+        self.jwks = jwks
+        self.issuer = issuer
+        self.authorized_parties = authorized_parties
+        self.verified = TTLCache(max_entries=max_entries)
+
+    def verify(self, token):
+        """Claims of a valid token; raises jwt.InvalidTokenError otherwise"""
+        digest = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        claims = self.verified.get(digest)
+        if claims is not None:
+            return claims
+
+        kid = jwt.get_unverified_header(token).get('kid')
+        claims = jwt.decode(
+            token, self.jwks.key(kid), algorithms=ALGORITHMS, issuer=self.issuer,
+            leeway=LEEWAY_SECONDS, options={'require': ['exp', 'sub'], 'verify_aud': False}
+        )
+        if self.authorized_parties and claims.get('azp') and claims['azp'] not in self.authorized_parties:
+            raise jwt.InvalidTokenError('Token was issued for another origin')
+
+        self.verified.set(digest, claims, ttl=claims['exp'] - time.time())
+        return claims
+
+def fetch_jwks(url, secret_key=None):
+    headers = {'Authorization': f'Bearer {secret_key}'} if secret_key else {}
+    response = requests.get(url, headers=headers, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+def create_token_verifier():
+    """Build the verifier configured by the environment; None when nothing is configured"""
+    jwks_url = os.environ.get('CLERK_JWKS_URL')
+    secret_key = os.environ.get('CLERK_SECRET_KEY')
+    if jwks_url:
+        fetch = lambda: fetch_jwks(jwks_url)
+    elif secret_key:
+        fetch = lambda: fetch_jwks(CLERK_JWKS_API, secret_key)
+    else:
+        return None
+
+    parties = os.environ.get('CLERK_AUTHORIZED_PARTIES')
+    return TokenVerifier(
+        JWKSCache(fetch, ttl=int(os.environ.get('JWKS_CACHE_SECONDS', '3600'))),
+        issuer=os.environ.get('CLERK_ISSUER') or None,
+        authorized_parties=[party.strip() for party in parties.split(',')] if parties else None,
+        max_entries=int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES', '10000'))
+    )
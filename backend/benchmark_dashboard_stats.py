@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark for /api/dashboard/stats
+Seeds a throwaway database and compares the latency of the original
+ten-query implementation against the $facet stats engine
+
+Usage: python benchmark_dashboard_stats.py [orders] [runs]
+Uses BENCHMARK_MONGODB_URI (default mongodb://localhost:27017/vendor_dashboard_bench)
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from dashboard_stats import compute_dashboard_stats
+
+BENCH_VENDOR_ID = 'bench_vendor'
+STATUSES = ['pending', 'confirmed', 'preparing', 'ready', 'out_for_delivery', 'delivered', 'cancelled']
+DISHES = [('Dal Rice', 80.0), ('Chicken Curry', 120.0), ('Vegetable Biryani', 100.0),
+          ('Roti Sabzi', 70.0), ('Lassi', 30.0), ('Paneer Tikka', 150.0)]
+
+def legacy_dashboard_stats(db, vendor_id):
+    """The pre-engine implementation, kept here as the baseline"""
+    # Originally the server-local day; the UTC day here matches the engine's default
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start + timedelta(days=1)
+
+    total_orders = db.orders.count_documents({'vendor_id': vendor_id})
+    total_menus = db.menus.count_documents({'vendor_id': vendor_id})
+
+    total_revenue_result = list(db.orders.aggregate([
+        {'$match': {'vendor_id': vendor_id}},
+        {'$group': {'_id': None, 'total': {'$sum': '$totalAmount'}}}
+    ]))
+    total_revenue = total_revenue_result[0]['total'] if total_revenue_result else 0
+
+    unique_customers = len(db.orders.distinct('customerEmail', {'vendor_id': vendor_id}))
+
+    active_subs_result = list(db.subscriptions.aggregate([
+        {'$match': {'vendor_id': vendor_id}},
+        {'$group': {'_id': None, 'total': {'$sum': '$subscriberCount'}}}
+    ]))
+    active_subscriptions = active_subs_result[0]['total'] if active_subs_result else 0
+
+    delivery_staff_count = db.delivery_staff.count_documents({'vendor_id': vendor_id})
+
+    today_revenue_result = list(db.orders.aggregate([
+        {'$match': {'vendor_id': vendor_id, 'createdAt': {'$gte': today_start, '$lt': today_end}}},
+        {'$group': {'_id': None, 'total': {'$sum': '$totalAmount'}}}
+    ]))
+    today_revenue = today_revenue_result[0]['total'] if today_revenue_result else 0
+
+    today_orders = db.orders.count_documents({
+        'vendor_id': vendor_id,
+        'createdAt': {'$gte': today_start, '$lt': today_end}
+    })
+    pending_orders = db.orders.count_documents({
+        'vendor_id': vendor_id,
+        'status': {'$in': ['pending', 'confirmed', 'preparing', 'ready', 'out_for_delivery']}
+    })
+    completed_orders = db.orders.count_documents({'vendor_id': vendor_id, 'status': 'delivered'})
+
+    return {
+        'totalOrders': total_orders,
+        'totalRevenue': round(total_revenue, 2),
+        'totalMenuItems': total_menus,
+        'totalCustomers': unique_customers,
+        'activeSubscriptions': active_subscriptions,
+        'deliveryStaff': delivery_staff_count,
+        'todayRevenue': round(today_revenue, 2),
+        'todayOrders': today_orders,
+        'pendingOrders': pending_orders,
+        'completedOrders': completed_orders
+    }
+
+def seed(db, order_count):
+    for name in ('orders', 'menus', 'subscriptions', 'delivery_staff', 'vendor_stats'):
+        db[name].drop()
+
+    now = datetime.utcnow()
+    db.menus.insert_many([
+        {'vendor_id': BENCH_VENDOR_ID, 'name': name, 'price': price} for name, price in DISHES
+    ])
+    db.subscriptions.insert_many([
+        {'vendor_id': BENCH_VENDOR_ID, 'planName': f'Plan {i}', 'subscriberCount': random.randint(0, 50)}
+        for i in range(5)
+    ])
+    db.delivery_staff.insert_many([
+        {'vendor_id': BENCH_VENDOR_ID, 'name': f'Rider {i}'} for i in range(8)
+    ])
+
+    batch = []
+    for i in range(order_count):
+        items = [{'name': name, 'price': price, 'quantity': random.randint(1, 3)}
+                 for name, price in random.sample(DISHES, random.randint(1, 3))]
+        created = now - timedelta(minutes=random.randint(0, 60 * 24 * 365))
+        batch.append({
+            'vendor_id': BENCH_VENDOR_ID,
+            'customerEmail': f'customer{random.randint(0, order_count // 4)}@example.com',
+            'items': items,
+            'totalAmount': sum(item['price'] * item['quantity'] for item in items),
+            'status': random.choice(STATUSES),
+            'createdAt': created,
+            'updatedAt': created
+        })
+        if len(batch) == 5000:
+            db.orders.insert_many(batch)
+            batch = []
+    if batch:
+        db.orders.insert_many(batch)
+
+def time_runs(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<10} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+def main():
+    order_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    uri = os.environ.get('BENCHMARK_MONGODB_URI', 'mongodb://localhost:27017/vendor_dashboard_bench')
+
+    client = MongoClient(uri)
+    db = client.get_default_database('vendor_dashboard_bench')
+
+    print(f"Seeding {order_count} orders into {db.name}...")
+    seed(db, order_count)
+
+    legacy = legacy_dashboard_stats(db, BENCH_VENDOR_ID)
+    # Exact mode so totalCustomers is comparable with distinct()
+    engine = compute_dashboard_stats(db, BENCH_VENDOR_ID, exact_customers=True)
+    if legacy != engine:
+        print("WARNING: results differ")
+        print(f"legacy: {legacy}")
+        print(f"engine: {engine}")
+
+    # Warm both paths before measuring
+    time_runs(lambda: legacy_dashboard_stats(db, BENCH_VENDOR_ID), 2)
+    time_runs(lambda: compute_dashboard_stats(db, BENCH_VENDOR_ID), 2)
+
+    print(f"{runs} runs each")
+    report('legacy', time_runs(lambda: legacy_dashboard_stats(db, BENCH_VENDOR_ID), runs))
+    report('engine', time_runs(lambda: compute_dashboard_stats(db, BENCH_VENDOR_ID), runs))
+
+    client.drop_database(db.name)
+    client.close()
+
+if __name__ == '__main__':
+    main()
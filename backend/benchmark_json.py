@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark for JSON serialization of order lists
+Builds an in-memory page of orders shaped like the documents the API
+returns and compares the old serialize_doc pass plus Flask's default
+provider against MongoJSONProvider. No database is needed
+
+Usage: python benchmark_json.py [orders] [runs]
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import Decimal128, ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import MongoJSONProvider
+
+STATUSES = ['pending', 'confirmed', 'preparing', 'ready', 'out_for_delivery', 'delivered', 'cancelled']
+DISHES = [('Dal Rice', 80.0), ('Chicken Curry', 120.0), ('Vegetable Biryani', 100.0),
+          ('Roti Sabzi', 70.0), ('Lassi', 30.0), ('Paneer Tikka', 150.0)]
+
+def serialize_doc(doc):
+    """The pre-provider pass, kept here as the baseline"""
+    if doc is None:
+        return None
+    if isinstance(doc, list):
+        return [serialize_doc(item) for item in doc]
+    if isinstance(doc, dict):
+        if '_id' in doc:
+            doc['_id'] = str(doc['_id'])
+        return doc
+    return doc
+
+def make_orders(order_count):
+    now = datetime.utcnow()
+    orders = []
+    for i in range(order_count):
+        items = [{'name': name, 'price': price, 'quantity': random.randint(1, 3)}
+                 for name, price in random.sample(DISHES, random.randint(1, 3))]
+        created = now - timedelta(minutes=random.randint(0, 60 * 24 * 30))
+        orders.append({
+            '_id': ObjectId(),
+            'vendor_id': 'bench_vendor',
+            'customerName': f'Customer {i}',
+            'customerEmail': f'customer{i}@example.com',
+            'customerPhone': '+91-9000000000',
+            'deliveryAddress': f'{i} Market Road, Pune',
+            'items': items,
+            'totalAmount': sum(item['price'] * item['quantity'] for item in items),
+            'status': random.choice(STATUSES),
+            'createdAt': created,
+            'updatedAt': created
+        })
+    return orders
+
+def time_runs(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<10} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+def main():
+    order_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = Flask(__name__)
+    legacy_provider = DefaultJSONProvider(app)
+    provider = MongoJSONProvider(app)
+
+    orders = make_orders(order_count)
+    print(f"Serializing {order_count} orders, {runs} runs each")
+
+    # serialize_doc mutates its input, so each run gets fresh copies like a new cursor would
+    def legacy():
+        page = [dict(order) for order in orders]
+        legacy_provider.dumps({'orders': serialize_doc(page)})
+
+    legacy_samples = time_runs(legacy, runs)
+    provider_samples = time_runs(lambda: provider.dumps({'orders': orders}), runs)
+    decimal_orders = [{**order, 'totalAmount': Decimal128(str(order['totalAmount']))} for order in orders]
+    decimal_samples = time_runs(lambda: provider.dumps({'orders': decimal_orders}), runs)
+
+    report('legacy', legacy_samples)
+    report('provider', provider_samples)
+    report('decimal128', decimal_samples)
+    if json_provider.orjson is None:
+        print("orjson is not installed; the provider ran on the standard library fallback")
+    print(f"Speedup: {statistics.median(legacy_samples) / statistics.median(provider_samples):.1f}x")
+
+if __name__ == '__main__':
+    main()
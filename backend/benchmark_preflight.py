@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark for CORS preflight handling
+Sends OPTIONS preflights straight to the WSGI callable and compares the
+original path (Flask routing into a catch-all OPTIONS view, with CORS
+headers set again by after_request) against CORSMiddleware answering
+before Flask. No server or database is needed
+
+Usage: python benchmark_preflight.py [requests] [runs]
+"""
+
+import statistics
+import sys
+import time
+
+from flask import Flask, make_response
+from werkzeug.test import EnvironBuilder
+
+from cors import CORSMiddleware
+
+def add_cors_headers(response):
+    """The pre-middleware helper, kept here as the baseline"""
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS, HEAD'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin'
+    response.headers['Access-Control-Allow-Credentials'] = 'true'
+    response.headers['Access-Control-Max-Age'] = '3600'
+    return response
+
+def legacy_app():
+    app = Flask(__name__)
+
+    @app.route('/', defaults={'path': ''}, methods=['OPTIONS'])
+    @app.route('/<path:path>', methods=['OPTIONS'])
+    def handle_options(path):
+        return add_cors_headers(make_response('', 200))
+
+    @app.after_request
+    def after_request(response):
+        return add_cors_headers(response)
+
+    return app
+
+def middleware_app():
+    app = Flask(__name__)
+    app.wsgi_app = CORSMiddleware(app.wsgi_app, ['https://vendor-dashboard-frontend-rho.vercel.app'])
+    return app
+
+def preflight_environ():
+    return EnvironBuilder(path='/api/orders', method='OPTIONS', headers={
+        'Origin': 'https://vendor-dashboard-frontend-rho.vercel.app',
+        'Access-Control-Request-Method': 'GET',
+        'Access-Control-Request-Headers': 'authorization',
+    }).get_environ()
+
+def requests_per_second(app, environ, count):
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(count):
+        body = app(dict(environ), start_response)
+        for _ in body:
+            pass
+        if hasattr(body, 'close'):
+            body.close()
+    return count / (time.perf_counter() - start)
+
+def report(label, samples):
+    print(f"{label:<10} median {statistics.median(samples):10.0f} req/s   min {min(samples):10.0f} req/s")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    environ = preflight_environ()
+    legacy, middleware = legacy_app(), middleware_app()
+
+    print(f"Sending {count} preflights per run, {runs} runs each")
+    legacy_samples = [requests_per_second(legacy, environ, count) for _ in range(runs)]
+    middleware_samples = [requests_per_second(middleware, environ, count) for _ in range(runs)]
+
+    report('legacy', legacy_samples)
+    report('middleware', middleware_samples)
+    print(f"Speedup: {statistics.median(middleware_samples) / statistics.median(legacy_samples):.1f}x")
+    # Chromium caps Access-Control-Max-Age at 7200s, Firefox at 86400s
+    print("Preflight cache: 3600s before, up to 7200s (Chromium) or 86400s (Firefox) now")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Menu and subscription writes for the Vendor Operations Dashboard
+Document builders and update whitelists shared by the single-item handlers
+and the /bulk endpoints, which run a list of mixed insert/update/delete
+operations as one bulk_write and report a result per item
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+MAX_BULK_OPERATIONS = 500
+OPERATIONS = ('insert', 'update', 'delete')
+
+MENU_FIELDS = ['name', 'description', 'price', 'category', 'mealType', 'availability',
+               'startDate', 'endDate', 'isPublished', 'imageUrl']
+SUBSCRIPTION_FIELDS = ['planName', 'description', 'price', 'duration', 'features', 'isActive']
+
+def menu_document(vendor_id, data):
+    now = datetime.utcnow()
+    return {
+        'vendor_id': vendor_id,
+        'name': data.get('name', ''),
+        'description': data.get('description', ''),
+        'price': data.get('price', 0),
+        'category': data.get('category', ''),
+        'mealType': data.get('mealType', 'breakfast'),
+        'availability': data.get('availability', 'daily'),
+        'startDate': data.get('startDate', ''),
+        'endDate': data.get('endDate', ''),
+        'isPublished': bool(data.get('isPublished', False)),
+        'imageUrl': data.get('imageUrl', ''),
+        'createdAt': now,
+        'updatedAt': now
+    }
+
+def subscription_document(vendor_id, data):
+    now = datetime.utcnow()
+    price = data.get('price', 0)
+    return {
+        'vendor_id': vendor_id,
+        'planName': data.get('planName', ''),
+        'description': data.get('description', ''),
+        'price': float(price) if str(price).strip() != '' else 0,
+        'duration': data.get('duration', 'monthly'),
+        'features': data.get('features', []),
+        'isActive': bool(data.get('isActive', True)),
+        'subscriberCount': 0,
+        'createdAt': now,
+        'updatedAt': now
+    }
+
+def update_fields(data, allowed):
+    """The $set document for an update, restricted to the allowed fields"""
+    fields = {field: data[field] for field in allowed if field in data}
+    fields['updatedAt'] = datetime.utcnow()
+    return fields
+
+def parse_bulk_body(body):
+    """Return (operations, ordered) from {"operations": [...], "ordered": bool}"""
+    if not isinstance(body, dict) or not isinstance(body.get('operations'), list):
+        raise ValueError('Body must be {"operations": [...], "ordered": true|false}')
+    operations = body['operations']
+    if not operations:
+        raise ValueError('operations must not be empty')
+    if len(operations) > MAX_BULK_OPERATIONS:
+        raise ValueError(f'At most {MAX_BULK_OPERATIONS} operations per request')
+    return operations, bool(body.get('ordered', True))
+
+def _object_id(item):
+    try:
+        return ObjectId(item.get('_id'))
+    except (InvalidId, TypeError):
+        raise ValueError('_id must be a valid id')
+
+def _plan(vendor_id, item, existing, build, allowed, prepare):
+    """Translate one operation into (write request, result) or raise ValueError"""
+    if not isinstance(item, dict) or item.get('op') not in OPERATIONS:
+        raise ValueError(f"op must be one of {', '.join(OPERATIONS)}")
+    op = item['op']
+    data = item.get('data') or {}
+    if not isinstance(data, dict):
+        raise ValueError('data must be an object')
+
+    if op == 'insert':
+        document = build(vendor_id, prepare(data))
+        document['_id'] = ObjectId()
+        return InsertOne(document), {'op': op, 'status': 'created', '_id': str(document['_id'])}
+
+    object_id = _object_id(item)
+    if object_id not in existing:
+        raise LookupError('Not found')
+    scope = {'_id': object_id, 'vendor_id': vendor_id}
+    if op == 'update':
+        request = UpdateOne(scope, {'$set': update_fields(prepare(data), allowed)})
+        return request, {'op': op, 'status': 'updated', '_id': str(object_id)}
+    return DeleteOne(scope), {'op': op, 'status': 'deleted', '_id': str(object_id)}
+
+def run_bulk(collection, vendor_id, operations, ordered, build, allowed, prepare=None):
+    """Validate and run operations as one bulk_write; returns (results, summary)
+
+    Ordered runs stop at the first failing item and report the rest as
+    skipped, matching MongoDB's ordered bulk_write semantics
+    """
+    prepare = prepare or (lambda data: data)
+
+    # One read resolves which ids exist and belong to this vendor
+    ids = set()
+    for item in operations:
+        if isinstance(item, dict) and item.get('op') in ('update', 'delete'):
+            try:
+                ids.add(_object_id(item))
+            except ValueError:
+                pass
+    existing = {doc['_id'] for doc in collection.find(
+        {'_id': {'$in': list(ids)}, 'vendor_id': vendor_id}, {'_id': 1})} if ids else set()
+
+    results, requests, positions = [], [], []
+    for index, item in enumerate(operations):
+        op = item.get('op') if isinstance(item, dict) else None
+        if ordered and results and results[-1]['status'] in ('error', 'skipped'):
+            results.append({'index': index, 'op': op, 'status': 'skipped'})
+            continue
+        try:
+            request, result = _plan(vendor_id, item, existing, build, allowed, prepare)
+        except LookupError as e:
+            results.append({'index': index, 'op': op, 'status': 'error', 'error': str(e),
+                            '_id': item.get('_id')})
+            continue
+        except ValueError as e:
+            results.append({'index': index, 'op': op, 'status': 'error', 'error': str(e)})
+            continue
+        result['index'] = index
+        results.append(result)
+        requests.append(request)
+        positions.append(index)
+
+    if requests:
+        try:
+            collection.bulk_write(requests, ordered=ordered)
+        except BulkWriteError as e:
+            failed = {error['index']: error['errmsg'] for error in e.details.get('writeErrors', [])}
+            first_failure = min(failed) if failed else len(requests)
+            for position, index in enumerate(positions):
+                if position in failed:
+                    results[index].update(status='error', error=failed[position])
+                elif ordered and position > first_failure:
+                    results[index] = {'index': index, 'op': results[index]['op'], 'status': 'skipped'}
+
+    summary = {status: 0 for status in ('created', 'updated', 'deleted', 'error', 'skipped')}
+    for result in results:
+        summary[result['status']] += 1
+    return results, summary
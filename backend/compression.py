@@ -0,0 +1,244 @@
+"""
+Response compression for the Vendor Operations Dashboard
+WSGI middleware around app.wsgi_app, so it runs the same under the Vercel
+handler and under gunicorn/waitress. It picks zstd, brotli or gzip from
+Accept-Encoding (zstd and brotli only when their packages are installed),
+compresses buffered bodies in one go and streamed bodies chunk by chunk,
+and leaves alone small bodies, binary types and anything already encoded
+
+Configuration (environment):
+    COMPRESSION             on (default) or off
+    COMPRESSION_MIN_SIZE    smallest buffered body worth compressing, default 1024 bytes
+    GZIP_LEVEL              1-9, default 6
+    BROTLI_QUALITY          0-11, default 4
+    ZSTD_LEVEL              1-22, default 3
+"""
+
+import itertools
+import os
+import threading
+import zlib
+
+from werkzeug.http import parse_accept_header
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+# Streamed bodies are flushed to the client once this much input is pending
+STREAM_FLUSH_BYTES = 16 * 1024
+
+def _gzip(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+def _brotli(level):
+    import brotli
+
+    compressor = brotli.Compressor(quality=level)
+    return compressor.process, compressor.flush, compressor.finish
+
+def _zstd(level):
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return (compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush)
+
+def available_encodings():
+    """Supported encodings in order of preference, mapped to their compressor factory"""
+    encodings = {}
+    try:
+        import zstandard  # noqa: F401
+        encodings['zstd'] = (_zstd, int(os.environ.get('ZSTD_LEVEL', '3')))
+    except ImportError:
+        pass
+    try:
+        import brotli  # noqa: F401
+        encodings['br'] = (_brotli, int(os.environ.get('BROTLI_QUALITY', '4')))
+    except ImportError:
+        pass
+    encodings['gzip'] = (_gzip, int(os.environ.get('GZIP_LEVEL', '6')))
+    return encodings
+
+def compressible(content_type):
+    mimetype = content_type.split(';')[0].strip().lower()
+    return (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+            or mimetype.endswith('+json'))
+
+def _get(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+def _without(headers, *names):
+    names = {name.lower() for name in names}
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+class CompressionMiddleware:
+    """Compress response bodies the client can decode"""
+
+    def __init__(self, app, encodings=None, min_size=1024):
+        self.app = app
+        self.encodings = available_encodings() if encodings is None else encodings
+        self.min_size = min_size
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.skipped = 0
+
+    def negotiate(self, accept_encoding):
+        """The encoding to use for an Accept-Encoding header, or None"""
+        if not accept_encoding or not self.encodings:
+            return None
+        accepted = parse_accept_header(accept_encoding)
+        return accepted.best_match(list(self.encodings))
+
+    def _record(self, encoding, bytes_in, bytes_out):
+        with self._lock:
+            stats = self._stats.setdefault(encoding, {'responses': 0, 'bytesIn': 0, 'bytesOut': 0})
+            stats['responses'] += 1
+            stats['bytesIn'] += bytes_in
+            stats['bytesOut'] += bytes_out
+
+    def stats(self):
+        with self._lock:
+            per_encoding = {encoding: dict(stats) for encoding, stats in self._stats.items()}
+            skipped = self.skipped
+        bytes_in = sum(stats['bytesIn'] for stats in per_encoding.values())
+        bytes_out = sum(stats['bytesOut'] for stats in per_encoding.values())
+        return {
+            'encodings': list(self.encodings),
+            'minSize': self.min_size,
+            'compressed': sum(stats['responses'] for stats in per_encoding.values()),
+            'skipped': skipped,
+            'bytesIn': bytes_in,
+            'bytesOut': bytes_out,
+            'bytesSaved': bytes_in - bytes_out,
+            'ratio': round(bytes_out / bytes_in, 4) if bytes_in else 0,
+            'perEncoding': per_encoding,
+        }
+
+    def _should_compress(self, environ, status, headers):
+        if environ.get('REQUEST_METHOD') == 'HEAD' or not status.startswith('200'):
+            return False
+        if _get(headers, 'Content-Encoding') or not compressible(_get(headers, 'Content-Type') or ''):
+            return False
+        return 'no-transform' not in (_get(headers, 'Cache-Control') or '')
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING'))
+        response = {}
+
+        def capture(status, headers, exc_info=None):
+            response.update(status=status, headers=headers, exc_info=exc_info)
+            return write
+
+        def write(data):
+            raise RuntimeError('CompressionMiddleware does not support the write() callable')
+
+        body = self.app(environ, capture)
+        chunks = iter(body)
+        # An app may defer start_response until its first chunk
+        pending = [] if 'status' in response else [next(chunks, b'')]
+        status, headers, exc_info = response['status'], response['headers'], response['exc_info']
+
+        if not self._should_compress(environ, status, headers):
+            start_response(status, headers, exc_info)
+            return self._passthrough(body, pending, chunks)
+
+        headers = self._vary(headers)
+        length = _get(headers, 'Content-Length')
+        if encoding is None or (length is not None and int(length) < self.min_size):
+            if encoding:
+                with self._lock:
+                    self.skipped += 1
+            start_response(status, headers, exc_info)
+            return self._passthrough(body, pending, chunks)
+
+        headers = self._weaken_etag(_without(headers, 'Content-Length'))
+        if length is None:
+            start_response(status, headers + [('Content-Encoding', encoding)], exc_info)
+            return self._compress_stream(encoding, body, itertools.chain(pending, chunks))
+
+        try:
+            data = b''.join(itertools.chain(pending, chunks))
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        compressed = self._compress_all(encoding, data)
+        start_response(status, headers + [('Content-Encoding', encoding),
+                                          ('Content-Length', str(len(compressed)))], exc_info)
+        return [compressed]
+
+    @staticmethod
+    def _vary(headers):
+        vary = _get(headers, 'Vary')
+        if vary and 'accept-encoding' in vary.lower():
+            return headers
+        value = f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'
+        return _without(headers, 'Vary') + [('Vary', value)]
+
+    @staticmethod
+    def _weaken_etag(headers):
+        # The encoded bytes differ from the identity body, so a strong tag no longer holds
+        etag = _get(headers, 'ETag')
+        if etag and not etag.startswith('W/'):
+            return _without(headers, 'ETag') + [('ETag', 'W/' + etag)]
+        return headers
+
+    def _compressor(self, encoding):
+        factory, level = self.encodings[encoding]
+        return factory(level)
+
+    def _compress_all(self, encoding, data):
+        compress, _, finish = self._compressor(encoding)
+        compressed = compress(data) + finish()
+        self._record(encoding, len(data), len(compressed))
+        return compressed
+
+    @staticmethod
+    def _passthrough(body, pending, chunks):
+        if not pending:
+            return body
+
+        def generate():
+            try:
+                yield from pending
+                yield from chunks
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+
+        return generate()
+
+    def _compress_stream(self, encoding, body, chunks):
+        compress, flush, finish = self._compressor(encoding)
+
+        def generate():
+            bytes_in = bytes_out = unflushed = 0
+            try:
+                for chunk in chunks:
+                    bytes_in += len(chunk)
+                    unflushed += len(chunk)
+                    data = compress(chunk)
+                    if unflushed >= STREAM_FLUSH_BYTES:
+                        data += flush()
+                        unflushed = 0
+                    if data:
+                        bytes_out += len(data)
+                        yield data
+                data = finish()
+                bytes_out += len(data)
+                yield data
+                self._record(encoding, bytes_in, bytes_out)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+
+        return generate()
+
+def create_compression(wsgi_app):
+    """Wrap a WSGI app with the compression configured by the environment"""
+    if os.environ.get('COMPRESSION', 'on').lower() == 'off':
+        return CompressionMiddleware(wsgi_app, encodings={})
+    return CompressionMiddleware(wsgi_app, min_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')))
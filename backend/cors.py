@@ -0,0 +1,77 @@
+"""
+CORS for the Vendor Operations Dashboard
+WSGI middleware that answers preflight requests itself, before Flask routes
+anything, and adds CORS headers to every other response from header lists
+built once at startup. A long Access-Control-Max-Age lets browsers reuse a
+preflight for a day instead of sending one before nearly every API call
+
+Configuration (environment):
+    CORS_ORIGINS   comma-separated allowed origins, or * (default) for any
+    CORS_MAX_AGE   seconds browsers may cache a preflight, default 86400
+"""
+
+import os
+
+ALLOW_METHODS = 'GET, POST, PUT, PATCH, DELETE, OPTIONS, HEAD'
+ALLOW_HEADERS = 'Content-Type, Authorization, X-Requested-With, Accept, Origin, If-None-Match'
+# Headers the dashboard reads from responses: ETags for revalidation, export file names
+EXPOSE_HEADERS = 'ETag, Content-Disposition'
+
+class CORSMiddleware:
+    """Answer preflights and add CORS headers for allowed origins"""
+
+    def __init__(self, app, origins=('*',), max_age=86400):
+        self.app = app
+        self.any_origin = '*' in origins
+        preflight = [('Access-Control-Allow-Methods', ALLOW_METHODS),
+                     ('Access-Control-Allow-Headers', ALLOW_HEADERS),
+                     ('Access-Control-Max-Age', str(max_age))]
+        if self.any_origin:
+            # A wildcard origin cannot be combined with credentials
+            self._simple = {'*': [('Access-Control-Allow-Origin', '*'),
+                                  ('Access-Control-Expose-Headers', EXPOSE_HEADERS)]}
+        else:
+            self._simple = {origin: [('Access-Control-Allow-Origin', origin),
+                                     ('Access-Control-Allow-Credentials', 'true'),
+                                     ('Access-Control-Expose-Headers', EXPOSE_HEADERS),
+                                     ('Vary', 'Origin')]
+                            for origin in origins}
+        self._preflight = {origin: headers + preflight + [('Content-Length', '0')]
+                           for origin, headers in self._simple.items()}
+        self._vary = [('Vary', 'Origin')]
+        self._rejected = self._vary + [('Content-Length', '0')]
+
+    def _key(self, origin):
+        if origin is None:
+            return None
+        if self.any_origin:
+            return '*'
+        return origin if origin in self._simple else None
+
+    def __call__(self, environ, start_response):
+        key = self._key(environ.get('HTTP_ORIGIN'))
+
+        if environ['REQUEST_METHOD'] == 'OPTIONS' and 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' in environ:
+            # Disallowed origins get no CORS headers, which the browser reports as a CORS failure
+            headers = self._preflight[key] if key else self._rejected
+            start_response('204 No Content', list(headers))
+            return []
+
+        if key is None:
+            if self.any_origin:
+                return self.app(environ, start_response)
+            extra = self._vary
+        else:
+            extra = self._simple[key]
+
+        def start_with_cors(status, headers, exc_info=None):
+            headers.extend(extra)
+            return start_response(status, headers, exc_info)
+
+        return self.app(environ, start_with_cors)
+
+def create_cors(wsgi_app):
+    """Wrap a WSGI app with the CORS policy configured by the environment"""
+    origins = [origin.strip().rstrip('/') for origin in os.environ.get('CORS_ORIGINS', '*').split(',')
+               if origin.strip()]
+    return CORSMiddleware(wsgi_app, origins or ['*'], int(os.environ.get('CORS_MAX_AGE', '86400')))
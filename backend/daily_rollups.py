@@ -0,0 +1,135 @@
+"""
+Daily revenue/order rollups for the Vendor Operations Dashboard
+One daily_rollups document per (vendor_id, UTC day) holds that day's revenue,
+order count, item count and a HyperLogLog sketch of customer emails, so chart
+endpoints read a small indexed range instead of regrouping raw orders
+
+Usage: python daily_rollups.py rebuild [vendor_id]
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+import hyperloglog
+
+DATE_FORMAT = '%Y-%m-%d'
+# Longest range the daily chart endpoints return
+MAX_DAYS = 366
+
+def day_start(value):
+    """Truncate a datetime to midnight"""
+    return datetime(value.year, value.month, value.day)
+
+def _item_count(order):
+    return sum(item.get('quantity', 0) or 0 for item in order.get('items', []))
+
+def record_order_created(db, order):
+    """Add a new order to its day's rollup"""
+    created = order.get('createdAt') or datetime.utcnow()
+    update = {'$inc': {
+        'revenue': order.get('totalAmount', 0) or 0,
+        'orders': 1,
+        'items': _item_count(order)
+    }}
+    if order.get('customerEmail') is not None:
+        update['$max'] = hyperloglog.max_update('customersHll', order['customerEmail'])
+    db.daily_rollups.update_one(
+        {'vendor_id': order['vendor_id'], 'date': day_start(created)},
+        update,
+        upsert=True
+    )
+
+def rebuild_daily_rollups(db, vendor_id=None):
+    """Recompute rollups from the raw orders collection; returns days written"""
+    match = [{'$match': {'vendor_id': vendor_id}}] if vendor_id is not None else []
+    day_key = {
+        'vendor_id': '$vendor_id',
+        'year': {'$year': '$createdAt'},
+        'month': {'$month': '$createdAt'},
+        'day': {'$dayOfMonth': '$createdAt'}
+    }
+
+    sketches = {}
+    customers = db.orders.aggregate(match + [
+        {'$match': {'customerEmail': {'$ne': None}}},
+        {'$group': {'_id': {**day_key, 'email': '$customerEmail'}}}
+    ], allowDiskUse=True)
+    for row in customers:
+        key = row['_id']
+        day = (key['vendor_id'], datetime(key['year'], key['month'], key['day']))
+        hyperloglog.add(sketches.setdefault(day, {}), key['email'])
+
+    totals = db.orders.aggregate(match + [
+        {'$group': {
+            '_id': day_key,
+            'revenue': {'$sum': '$totalAmount'},
+            'orders': {'$sum': 1},
+            'items': {'$sum': {'$sum': '$items.quantity'}}
+        }}
+    ])
+
+    db.daily_rollups.delete_many({'vendor_id': vendor_id} if vendor_id is not None else {})
+    operations = []
+    for row in totals:
+        key = row['_id']
+        date = datetime(key['year'], key['month'], key['day'])
+        operations.append(UpdateOne(
+            {'vendor_id': key['vendor_id'], 'date': date},
+            {'$set': {
+                'revenue': row['revenue'],
+                'orders': row['orders'],
+                'items': row['items'],
+                'customersHll': hyperloglog.to_document(sketches.get((key['vendor_id'], date), {}))
+            }},
+            upsert=True
+        ))
+    if operations:
+        db.daily_rollups.bulk_write(operations, ordered=False)
+    return len(operations)
+
+def daily_series(db, vendor_id, start, end, fields):
+    """Return one gap-filled entry per day in [start, end] with the requested fields"""
+    rollups = db.daily_rollups.find(
+        {'vendor_id': vendor_id, 'date': {'$gte': start, '$lte': end}},
+        {field: 1 for field in ('date',) + tuple(fields)}
+    )
+    by_date = {doc['date']: doc for doc in rollups}
+
+    series = []
+    for i in range((end - start).days + 1):
+        current = start + timedelta(days=i)
+        doc = by_date.get(current, {})
+        entry = {'date': current.strftime(DATE_FORMAT)}
+        for field in fields:
+            entry[field] = doc.get(field, 0)
+        series.append(entry)
+    return series
+
+def daily_sketches(db, vendor_id, start, end):
+    """Return {day: customer sketch} for the days in [start, end] that have orders"""
+    rollups = db.daily_rollups.find(
+        {'vendor_id': vendor_id, 'date': {'$gte': start, '$lte': end}},
+        {'date': 1, 'customersHll': 1}
+    )
+    return {doc['date']: hyperloglog.from_document(doc.get('customersHll')) for doc in rollups}
+
+def main():
+    from app import mongo
+    from indexes import ensure_indexes
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'rebuild':
+        print(__doc__)
+        sys.exit(1)
+    if not mongo:
+        print("MongoDB not connected!")
+        sys.exit(1)
+
+    vendor_id = sys.argv[2] if len(sys.argv) > 2 else None
+    ensure_indexes(mongo.db)
+    count = rebuild_daily_rollups(mongo.db, vendor_id)
+    print(f"Rebuilt {count} daily rollup(s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Dashboard stats engine for the Vendor Operations Dashboard
+Reads the lifetime order counters and customer sketch from vendor_stats,
+derives today's figures from an index-bounded aggregation over today's
+orders and runs the per-collection counts concurrently. "Today" is the
+vendor's local day, the same one the daily charts use
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from timeseries import get_zone, next_bucket, truncate
+from vendor_stats import get_vendor_counters
+
+EMPTY_STATS = {
+    'totalOrders': 0, 'totalRevenue': 0, 'totalMenuItems': 0,
+    'totalCustomers': 0, 'activeSubscriptions': 0, 'deliveryStaff': 0,
+    'todayRevenue': 0, 'todayOrders': 0, 'pendingOrders': 0, 'completedOrders': 0
+}
+
+# PyMongo clients are thread-safe, so a small shared pool is enough to overlap
+# the independent round trips of a single stats request
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dashboard-stats')
+
+def today_bounds(now=None, timezone_name=None):
+    """Return the [start, end) of the vendor's current local day as naive UTC"""
+    zone = get_zone(timezone_name)
+    now = now or datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        # createdAt is stored as naive UTC, and so are naive nows
+        now = now.replace(tzinfo=timezone.utc)
+    today_start = truncate(now, 'day', zone)
+    today_end = next_bucket(today_start, 'day', zone)
+    return tuple(bound.astimezone(timezone.utc).replace(tzinfo=None) for bound in (today_start, today_end))
+
+def today_pipeline(vendor_id, today_start, today_end):
+    """Today's order count and revenue"""
+    # The range belongs in the leading $match: there the (vendor_id, createdAt)
+    # index bounds the scan to today, inside a $facet it would read every order
+    return [
+        {'$match': {'vendor_id': vendor_id, 'createdAt': {'$gte': today_start, '$lt': today_end}}},
+        {'$group': {'_id': None, 'orders': {'$sum': 1}, 'revenue': {'$sum': '$totalAmount'}}}
+    ]
+
+def exact_customers_pipeline(vendor_id):
+    """Audit mode: count distinct emails inside MongoDB instead of using the sketch"""
+    return [
+        {'$match': {'vendor_id': vendor_id, 'customerEmail': {'$ne': None}}},
+        {'$group': {'_id': '$customerEmail'}},
+        {'$count': 'total'}
+    ]
+
+def _today_figures(db, vendor_id, today_start, today_end):
+    result = list(db.orders.aggregate(today_pipeline(vendor_id, today_start, today_end)))
+    today = result[0] if result else {}
+    return {'todayOrders': today.get('orders', 0), 'todayRevenue': today.get('revenue', 0)}
+
+def _exact_customers(db, vendor_id):
+    result = list(db.orders.aggregate(exact_customers_pipeline(vendor_id), allowDiskUse=True))
+    return result[0]['total'] if result else 0
+
+def _active_subscriptions(db, vendor_id):
+    result = list(db.subscriptions.aggregate([
+        {'$match': {'vendor_id': vendor_id}},
+        {'$group': {'_id': None, 'total': {'$sum': '$subscriberCount'}}}
+    ]))
+    return result[0]['total'] if result else 0
+
+def compute_dashboard_stats(db, vendor_id, now=None, exact_customers=False, timezone_name=None):
+    """Return the /api/dashboard/stats payload for a vendor"""
+    today_start, today_end = today_bounds(now, timezone_name)
+
+    counters_future = _executor.submit(get_vendor_counters, db, vendor_id)
+    today_future = _executor.submit(_today_figures, db, vendor_id, today_start, today_end)
+    customers_future = _executor.submit(_exact_customers, db, vendor_id) if exact_customers else None
+    menus_future = _executor.submit(db.menus.count_documents, {'vendor_id': vendor_id})
+    subs_future = _executor.submit(_active_subscriptions, db, vendor_id)
+    staff_future = _executor.submit(db.delivery_staff.count_documents, {'vendor_id': vendor_id})
+
+    counters = counters_future.result()
+    figures = today_future.result()
+    return {
+        'totalOrders': counters['totalOrders'],
+        'totalRevenue': round(counters['totalRevenue'], 2),
+        'totalMenuItems': menus_future.result(),
+        'totalCustomers': customers_future.result() if customers_future else counters['totalCustomers'],
+        'activeSubscriptions': subs_future.result(),
+        'deliveryStaff': staff_future.result(),
+        'todayRevenue': round(figures['todayRevenue'], 2),
+        'todayOrders': figures['todayOrders'],
+        'pendingOrders': counters['pendingOrders'],
+        'completedOrders': counters['completedOrders']
+    }
@@ -0,0 +1,163 @@
+"""
+Top-dishes leaderboard for the Vendor Operations Dashboard
+dish_stats holds cumulative quantity and revenue per (vendor_id, dish) and
+dish_daily_stats the same per UTC day, both updated as orders are written,
+so "top N dishes" is an indexed sorted read instead of an $unwind over history
+
+Usage: python dish_stats.py rebuild [vendor_id]
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from pymongo import DESCENDING, UpdateOne
+
+from daily_rollups import day_start
+
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 50
+
+def _line_items(order):
+    for item in order.get('items', []):
+        if not item.get('name'):
+            continue
+        quantity = item.get('quantity', 0) or 0
+        price = item.get('price', 0) or 0
+        yield item['name'], quantity, price
+
+def record_order_created(db, order):
+    """Add a new order's line items to the cumulative and daily dish counters"""
+    vendor_id = order['vendor_id']
+    date = day_start(order.get('createdAt') or datetime.utcnow())
+    totals, daily = [], []
+    for name, quantity, price in _line_items(order):
+        update = {
+            '$inc': {'orders': quantity, 'revenue': price * quantity},
+            '$setOnInsert': {'price': price}
+        }
+        totals.append(UpdateOne({'vendor_id': vendor_id, 'name': name}, update, upsert=True))
+        daily.append(UpdateOne({'vendor_id': vendor_id, 'date': date, 'name': name}, update, upsert=True))
+    if totals:
+        db.dish_stats.bulk_write(totals, ordered=False)
+        db.dish_daily_stats.bulk_write(daily, ordered=False)
+
+def rebuild_dish_stats(db, vendor_id=None):
+    """Recompute both dish collections from the raw orders collection"""
+    match = [{'$match': {'vendor_id': vendor_id}}] if vendor_id is not None else []
+    line_fields = {
+        'orders': {'$sum': '$items.quantity'},
+        'revenue': {'$sum': {'$multiply': ['$items.price', '$items.quantity']}},
+        'price': {'$first': '$items.price'}
+    }
+    scope = {'vendor_id': vendor_id} if vendor_id is not None else {}
+
+    totals = db.orders.aggregate(match + [
+        {'$unwind': '$items'},
+        {'$group': {'_id': {'vendor_id': '$vendor_id', 'name': '$items.name'}, **line_fields}}
+    ], allowDiskUse=True)
+    db.dish_stats.delete_many(scope)
+    operations = [
+        UpdateOne({'vendor_id': row['_id']['vendor_id'], 'name': row['_id']['name']},
+                  {'$set': {'orders': row['orders'], 'revenue': row['revenue'], 'price': row['price']}},
+                  upsert=True)
+        for row in totals if row['_id'].get('name')
+    ]
+    if operations:
+        db.dish_stats.bulk_write(operations, ordered=False)
+
+    daily = db.orders.aggregate(match + [
+        {'$unwind': '$items'},
+        {'$group': {
+            '_id': {
+                'vendor_id': '$vendor_id',
+                'name': '$items.name',
+                'year': {'$year': '$createdAt'},
+                'month': {'$month': '$createdAt'},
+                'day': {'$dayOfMonth': '$createdAt'}
+            },
+            **line_fields
+        }}
+    ], allowDiskUse=True)
+    db.dish_daily_stats.delete_many(scope)
+    daily_operations = []
+    for row in daily:
+        key = row['_id']
+        if not key.get('name'):
+            continue
+        daily_operations.append(UpdateOne(
+            {'vendor_id': key['vendor_id'], 'date': datetime(key['year'], key['month'], key['day']),
+             'name': key['name']},
+            {'$set': {'orders': row['orders'], 'revenue': row['revenue'], 'price': row['price']}},
+            upsert=True
+        ))
+    if daily_operations:
+        db.dish_daily_stats.bulk_write(daily_operations, ordered=False)
+    return len(operations)
+
+def parse_leaderboard_args(args):
+    """Validate ?limit= and ?window= (days, e.g. 30 or 30d)"""
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_LIMIT}')
+
+    window = args.get('window')
+    if window:
+        try:
+            window = int(window.rstrip('d'))
+        except ValueError:
+            raise ValueError('window must be a number of days, e.g. 30 or 30d')
+        if window < 1:
+            raise ValueError('window must be at least 1 day')
+    return limit, window or None
+
+def top_dishes(db, vendor_id, limit=DEFAULT_LIMIT, window=None, today=None):
+    """Return the top dishes by quantity, overall or over the last `window` days"""
+    if window is None:
+        rows = db.dish_stats.find({'vendor_id': vendor_id}).sort('orders', DESCENDING).limit(limit)
+    else:
+        since = day_start(today or datetime.utcnow()) - timedelta(days=window - 1)
+        rows = db.dish_daily_stats.aggregate([
+            {'$match': {'vendor_id': vendor_id, 'date': {'$gte': since}}},
+            {'$group': {
+                '_id': '$name',
+                'orders': {'$sum': '$orders'},
+                'revenue': {'$sum': '$revenue'},
+                'price': {'$first': '$price'}
+            }},
+            {'$sort': {'orders': -1}},
+            {'$limit': limit},
+            {'$project': {'name': '$_id', 'orders': 1, 'revenue': 1, 'price': 1}}
+        ])
+
+    return [
+        {
+            '_id': str(i + 1),
+            'name': row['name'],
+            'orders': row['orders'],
+            'revenue': round(row['revenue'], 2),
+            'price': round(row.get('price') or 0, 2)
+        }
+        for i, row in enumerate(rows)
+    ]
+
+def main():
+    from app import mongo
+    from indexes import ensure_indexes
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'rebuild':
+        print(__doc__)
+        sys.exit(1)
+    if not mongo:
+        print("MongoDB not connected!")
+        sys.exit(1)
+
+    vendor_id = sys.argv[2] if len(sys.argv) > 2 else None
+    ensure_indexes(mongo.db)
+    count = rebuild_dish_stats(mongo.db, vendor_id)
+    print(f"Rebuilt stats for {count} dish(es)")
+
+if __name__ == '__main__':
+    main()
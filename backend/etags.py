@@ -0,0 +1,34 @@
+"""
+Conditional GETs for the Vendor Operations Dashboard read endpoints
+Every write through the API bumps a per-vendor, per-scope version counter in
+the vendor_versions collection. A read endpoint's ETag is derived from that
+counter, so If-None-Match can be answered with 304 from one lookup by _id,
+before the endpoint runs its query or serializes anything. The ETag also
+carries a time window so data that moves without an API write (orders from
+other services, "today" on the dashboard) is re-sent at least once a window
+
+Configuration (environment):
+    ETAG_WINDOW_SECONDS   longest an ETag stays valid without a write, default 300
+"""
+
+import hashlib
+import os
+import time
+
+WINDOW_SECONDS = int(os.environ.get('ETAG_WINDOW_SECONDS', '300'))
+
+def bump_versions(db, vendor_id, scopes):
+    """Move the version of each scope on, invalidating every ETag issued for it"""
+    if scopes:
+        db.vendor_versions.update_one({'_id': vendor_id},
+                                      {'$inc': {scope: 1 for scope in scopes}}, upsert=True)
+
+def current_version(db, vendor_id, scope):
+    doc = db.vendor_versions.find_one({'_id': vendor_id}, {scope: 1})
+    return doc.get(scope, 0) if doc else 0
+
+def make_etag(vendor_id, scope, version, route, now=None):
+    """Opaque tag for one route's body at a scope version"""
+    window = int((time.time() if now is None else now) // WINDOW_SECONDS)
+    key = f'{vendor_id}:{scope}:{version}:{window}:{route}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
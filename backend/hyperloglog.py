@@ -0,0 +1,58 @@
+"""
+HyperLogLog sketches for approximate unique-customer counts
+A sketch is a sparse {register index: rank} mapping. Adding a value touches
+exactly one register, so MongoDB can apply it atomically with $max, and
+sketches for any set of days merge by taking the per-register maximum
+"""
+
+import hashlib
+import math
+
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+_REMAINDER_BITS = 64 - PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+def register_for(value):
+    """Return the (register index, rank) pair a value sets"""
+    digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+    hashed = int.from_bytes(digest, 'big')
+    index = hashed >> _REMAINDER_BITS
+    remainder = hashed & ((1 << _REMAINDER_BITS) - 1)
+    return index, _REMAINDER_BITS - remainder.bit_length() + 1
+
+def max_update(field, value):
+    """The $max document that adds a value to the sketch stored at `field`"""
+    index, rank = register_for(value)
+    return {f'{field}.{index}': rank}
+
+def add(sketch, value):
+    index, rank = register_for(value)
+    if rank > sketch.get(index, 0):
+        sketch[index] = rank
+    return sketch
+
+def from_document(stored):
+    """Convert a sketch read from MongoDB (string keys) to an in-memory sketch"""
+    return {int(index): rank for index, rank in (stored or {}).items()}
+
+def to_document(sketch):
+    return {str(index): rank for index, rank in sketch.items()}
+
+def merge(*sketches):
+    merged = {}
+    for sketch in sketches:
+        for index, rank in sketch.items():
+            if rank > merged.get(index, 0):
+                merged[index] = rank
+    return merged
+
+def estimate(sketch):
+    """Estimated number of distinct values added to the sketch"""
+    zeros = REGISTERS - len(sketch)
+    harmonic = zeros + sum(2.0 ** -rank for rank in sketch.values())
+    raw = _ALPHA * REGISTERS * REGISTERS / harmonic
+    if raw <= 2.5 * REGISTERS and zeros:
+        # Linear counting is far more accurate while most registers are empty
+        return int(round(REGISTERS * math.log(REGISTERS / zeros)))
+    return int(round(raw))
@@ -0,0 +1,176 @@
+"""
+Content-addressed image store for the Vendor Operations Dashboard
+Images are kept once per SHA-256 of their bytes, in GridFS or on the local
+filesystem, and menus keep only the short /api/images/<hash> URL, so menu
+documents stay small and the image itself is cacheable forever
+
+Configuration (environment):
+    IMAGE_STORE         gridfs (default) or local
+    IMAGE_STORE_PATH    directory for the local store, default ./images
+
+Usage: python image_store.py migrate   # move base64 menu images into the store
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import sys
+
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+URL_PREFIX = '/api/images/'
+HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+DATA_URL_PATTERN = re.compile(r'^data:([\w/+.-]+)?(;[\w=-]+)*;base64,', re.IGNORECASE)
+
+def sniff_type(data):
+    """Content type from the file signature; None for anything but JPEG, PNG or WebP"""
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+def decode_data_url(value):
+    """Return the bytes of a base64 data URL"""
+    match = DATA_URL_PATTERN.match(value)
+    if not match:
+        raise ValueError('Image must be a base64 data URL')
+    try:
+        return base64.b64decode(value[match.end():], validate=True)
+    except binascii.Error:
+        raise ValueError('Image data is not valid base64')
+
+def image_url(digest):
+    return URL_PREFIX + digest
+
+def is_data_url(value):
+    return isinstance(value, str) and value.startswith('data:')
+
+class GridFSStore:
+    """Images as GridFS files whose _id is the content hash"""
+
+    name = 'gridfs'
+
+    def __init__(self, db, bucket='images'):
+        import gridfs
+
+        self.fs = gridfs.GridFS(db, collection=bucket)
+
+    def exists(self, digest):
+        return self.fs.exists(digest)
+
+    def put(self, digest, data, content_type):
+        from gridfs.errors import FileExists
+
+        try:
+            self.fs.put(data, _id=digest, metadata={'contentType': content_type})
+        except FileExists:
+            # Same bytes uploaded concurrently; the stored copy is identical
+            pass
+
+    def get(self, digest):
+        """Return (bytes, content type) or None"""
+        from gridfs.errors import NoFile
+
+        try:
+            stored = self.fs.get(digest)
+        except NoFile:
+            return None
+        data = stored.read()
+        content_type = (stored.metadata or {}).get('contentType') or sniff_type(data)
+        return data, content_type
+
+class LocalStore:
+    """Images as files named by hash under a directory, fanned out by prefix"""
+
+    name = 'local'
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest):
+        return os.path.exists(self._path(digest))
+
+    def put(self, digest, data, content_type):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def get(self, digest):
+        try:
+            with open(self._path(digest), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return data, sniff_type(data)
+
+def create_image_store(db):
+    """Build the store configured by the environment"""
+    if os.environ.get('IMAGE_STORE', 'gridfs').lower() == 'local':
+        return LocalStore(os.environ.get('IMAGE_STORE_PATH', 'images'))
+    return GridFSStore(db)
+
+def store_image(store, data, on_stored=None):
+    """Validate and store image bytes, returning their hash"""
+    if not data:
+        raise ValueError('Image is empty')
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ValueError('Image must be 5MB or smaller')
+    content_type = sniff_type(data)
+    if content_type is None:
+        raise ValueError('Image must be JPEG, PNG or WebP')
+
+    digest = hashlib.sha256(data).hexdigest()
+    if not store.exists(digest):
+        store.put(digest, data, content_type)
+    if on_stored:
+        on_stored(digest)
+    return digest
+
+def externalize(store, value, on_stored=None):
+    """Replace a base64 data URL with the URL of its stored copy; other values pass through"""
+    if not is_data_url(value):
+        return value
+    return image_url(store_image(store, decode_data_url(value), on_stored))
+
+def migrate_menus(db, store):
+    """Move every inline base64 menu image into the store, returning (migrated, failed)"""
+    migrated, failed = 0, 0
+    menus = db.menus.find({'imageUrl': {'$regex': '^data:'}}, {'imageUrl': 1}).batch_size(50)
+    for menu in menus:
+        try:
+            url = externalize(store, menu['imageUrl'])
+        except ValueError as e:
+            print(f"Skipping menu {menu['_id']}: {e}")
+            failed += 1
+            continue
+        db.menus.update_one({'_id': menu['_id'], 'imageUrl': menu['imageUrl']},
+                            {'$set': {'imageUrl': url}})
+        migrated += 1
+    return migrated, failed
+
+def main():
+    from app import mongo
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'migrate':
+        print(__doc__)
+        sys.exit(1)
+    if not mongo:
+        print("MongoDB not connected!")
+        sys.exit(1)
+
+    migrated, failed = migrate_menus(mongo.db, create_image_store(mongo.db))
+    print(f"Moved {migrated} menu image(s) into the store, {failed} skipped")
+
+if __name__ == '__main__':
+    main()
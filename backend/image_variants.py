@@ -0,0 +1,189 @@
+"""
+Responsive image variants for the Vendor Operations Dashboard
+Every stored image gets thumb, card and full renditions, resized and
+re-encoded as WebP (JPEG when Pillow lacks WebP) on a background worker pool.
+Variants are content-addressed like the original; image_variants maps an
+original hash to its variant hashes, or marks it failed when it cannot be
+rendered so it is not retried on every request (backfill retries failures)
+
+Configuration (environment):
+    IMAGE_WORKERS       background resize threads, default 2
+
+Usage: python image_variants.py backfill   # render variants for every stored menu image
+"""
+
+import hashlib
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from response_cache import TTLCache
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# Variant name -> longest edge in pixels
+VARIANTS = {'thumb': 160, 'card': 480, 'full': 1600}
+QUALITY = 80
+
+def output_format():
+    """('WEBP' or 'JPEG', content type) for re-encoded variants"""
+    if features.check('webp'):
+        return 'WEBP', 'image/webp'
+    return 'JPEG', 'image/jpeg'
+
+def parse_variant(args):
+    """Variant name from ?size=thumb|card|full or ?w=<pixels>; None for the original"""
+    size = args.get('size')
+    if size:
+        if size not in VARIANTS:
+            raise ValueError(f"size must be one of {', '.join(VARIANTS)}")
+        return size
+    width = args.get('w')
+    if width:
+        try:
+            width = int(width)
+        except ValueError:
+            raise ValueError('w must be an integer')
+        # Smallest variant at least as wide as requested
+        for name, edge in sorted(VARIANTS.items(), key=lambda item: item[1]):
+            if edge >= width:
+                return name
+        return 'full'
+    return None
+
+def render_variant(data, edge):
+    """Resize image bytes to fit within edge x edge and re-encode them"""
+    image_format, _ = output_format()
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ('RGB', 'RGBA') or (image_format == 'JPEG' and image.mode != 'RGB'):
+            keep_alpha = image_format == 'WEBP' and (image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info)
+            image = image.convert('RGBA' if keep_alpha else 'RGB')
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, image_format, quality=QUALITY)
+    return output.getvalue()
+
+def generate_variants(db, store, digest):
+    """Render and store every variant of an image; returns {name: hash}"""
+    stored = store.get(digest)
+    if stored is None:
+        return None
+    data, _ = stored
+    _, content_type = output_format()
+
+    variants = {}
+    for name, edge in VARIANTS.items():
+        rendered = render_variant(data, edge)
+        if len(rendered) >= len(data):
+            # Already small enough; re-encoding would only grow it
+            variants[name] = digest
+            continue
+        variant_digest = hashlib.sha256(rendered).hexdigest()
+        if not store.exists(variant_digest):
+            store.put(variant_digest, rendered, content_type)
+        variants[name] = variant_digest
+
+    db.image_variants.update_one(
+        {'_id': digest},
+        {'$set': {'variants': variants, 'createdAt': datetime.utcnow()}, '$unset': {'failed': '', 'error': ''}},
+        upsert=True
+    )
+    return variants
+
+def record_failure(db, digest, error):
+    """Mark an image whose variants cannot be rendered so requests stop re-queueing it"""
+    db.image_variants.update_one(
+        {'_id': digest},
+        {'$setOnInsert': {'variants': {}, 'failed': True, 'error': str(error)[:500],
+                          'createdAt': datetime.utcnow()}},
+        upsert=True
+    )
+
+class VariantWorker:
+    """Renders variants off the request thread and answers variant lookups"""
+
+    def __init__(self, db, store, max_workers=2):
+        self.db = db
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-variants')
+        self._pending = set()
+        self._lock = threading.Lock()
+        # Variant maps never change once written, so lookups can be cached for long
+        self._cache = TTLCache(max_entries=4096, ttl=3600)
+
+    def submit(self, digest):
+        """Queue variant rendering for an image unless it is done or already queued"""
+        if Image is None or self.lookup(digest) is not None:
+            return None
+        with self._lock:
+            if digest in self._pending:
+                return None
+            self._pending.add(digest)
+        return self._executor.submit(self._run, digest)
+
+    def _run(self, digest):
+        try:
+            return generate_variants(self.db, self.store, digest)
+        except Exception as e:
+            print(f"Variant rendering failed for {digest}: {e}")
+            record_failure(self.db, digest, e)
+        finally:
+            with self._lock:
+                self._pending.discard(digest)
+
+    def lookup(self, digest, name=None):
+        """The variant map of an image (or one variant's hash), None until rendered
+
+        Images whose rendering failed map to no variants
+        """
+        variants = self._cache.get(digest)
+        if variants is None:
+            doc = self.db.image_variants.find_one({'_id': digest}, {'variants': 1})
+            if doc is None:
+                return None
+            variants = doc['variants']
+            self._cache.set(digest, variants)
+        return variants.get(name) if name else variants
+
+def create_variant_worker(db, store):
+    return VariantWorker(db, store, max_workers=int(os.environ.get('IMAGE_WORKERS', '2')))
+
+def main():
+    from app import mongo
+    from image_store import create_image_store, URL_PREFIX
+
+    if len(sys.argv) < 2 or sys.argv[1] != 'backfill':
+        print(__doc__)
+        sys.exit(1)
+    if not mongo:
+        print("MongoDB not connected!")
+        sys.exit(1)
+    if Image is None:
+        print("Pillow is not installed!")
+        sys.exit(1)
+
+    store = create_image_store(mongo.db)
+    urls = mongo.db.menus.distinct('imageUrl', {'imageUrl': {'$regex': '^' + URL_PREFIX}})
+    done = {doc['_id'] for doc in mongo.db.image_variants.find({'failed': {'$ne': True}}, {'_id': 1})}
+    count = 0
+    for url in urls:
+        digest = url[len(URL_PREFIX):]
+        if digest in done:
+            continue
+        try:
+            if generate_variants(mongo.db, store, digest):
+                count += 1
+        except Exception as e:
+            print(f"Variant rendering failed for {digest}: {e}")
+            record_failure(mongo.db, digest, e)
+    print(f"Rendered variants for {count} image(s)")
+
+if __name__ == '__main__':
+    main()
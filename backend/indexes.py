@@ -0,0 +1,188 @@
+"""
+Index management for the Vendor Operations Dashboard
+Declares every index the app relies on, creates them idempotently and reports
+query shapes the app issues that no index serves. Each collection's indexes
+are created on their own, so one failure (usually duplicate vendors from
+before the unique clerk_user_id index) does not leave the rest unindexed
+
+Usage: python indexes.py ensure   # create missing indexes
+       python indexes.py check    # list uncovered query shapes and duplicate vendors
+       python indexes.py dedupe   # delete duplicate vendors that own no data
+"""
+
+import sys
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from sync import DELETION_RETENTION
+
+# collection -> list of (keys, options)
+INDEXES = {
+    'vendors': [
+        ([('clerk_user_id', ASCENDING)], {'unique': True}),
+    ],
+    'orders': [
+        # Trailing _id lets keyset pages on (createdAt, _id) walk the index in order
+        ([('vendor_id', ASCENDING), ('createdAt', ASCENDING), ('_id', ASCENDING)], {}),
+        ([('vendor_id', ASCENDING), ('status', ASCENDING), ('createdAt', ASCENDING), ('_id', ASCENDING)], {}),
+        ([('vendor_id', ASCENDING), ('updatedAt', ASCENDING)], {}),
+    ],
+    'menus': [
+        ([('vendor_id', ASCENDING), ('updatedAt', ASCENDING)], {}),
+    ],
+    'subscriptions': [
+        ([('vendor_id', ASCENDING), ('updatedAt', ASCENDING)], {}),
+    ],
+    'delivery_staff': [
+        ([('vendor_id', ASCENDING), ('updatedAt', ASCENDING)], {}),
+    ],
+    'deletions': [
+        ([('vendor_id', ASCENDING), ('deletedAt', ASCENDING)], {}),
+        # Tombstones expire once no client can still be syncing from before them
+        ([('deletedAt', ASCENDING)], {'expireAfterSeconds': int(DELETION_RETENTION.total_seconds())}),
+    ],
+    'daily_rollups': [
+        ([('vendor_id', ASCENDING), ('date', ASCENDING)], {'unique': True}),
+    ],
+    'dish_stats': [
+        ([('vendor_id', ASCENDING), ('name', ASCENDING)], {'unique': True}),
+        ([('vendor_id', ASCENDING), ('orders', DESCENDING)], {}),
+    ],
+    'dish_daily_stats': [
+        ([('vendor_id', ASCENDING), ('date', ASCENDING), ('name', ASCENDING)], {'unique': True}),
+    ],
+}
+
+# Query shapes the app issues: (collection, equality fields, range/sort field or None)
+QUERY_SHAPES = [
+    ('vendors', ('clerk_user_id',), None),
+    ('orders', ('vendor_id',), None),
+    ('orders', ('vendor_id',), 'createdAt'),
+    ('orders', ('vendor_id', 'status'), None),
+    ('orders', ('vendor_id', 'status'), 'createdAt'),
+    ('orders', ('vendor_id',), 'updatedAt'),
+    ('menus', ('vendor_id',), None),
+    ('menus', ('vendor_id',), 'updatedAt'),
+    ('subscriptions', ('vendor_id',), None),
+    ('subscriptions', ('vendor_id',), 'updatedAt'),
+    ('delivery_staff', ('vendor_id',), None),
+    ('delivery_staff', ('vendor_id',), 'updatedAt'),
+    ('deletions', ('vendor_id',), 'deletedAt'),
+    ('daily_rollups', ('vendor_id',), 'date'),
+    ('dish_stats', ('vendor_id', 'name'), None),
+    ('dish_stats', ('vendor_id',), 'orders'),
+    ('dish_daily_stats', ('vendor_id',), 'date'),
+    ('dish_daily_stats', ('vendor_id', 'date', 'name'), None),
+]
+
+# Collections whose documents belong to a vendor through vendor_id
+VENDOR_DATA = ('orders', 'menus', 'subscriptions', 'delivery_staff')
+
+def ensure_indexes(db):
+    """Create every declared index and return {collection: error} for those that failed"""
+    failures = {}
+    for collection, specs in INDEXES.items():
+        models = [IndexModel(keys, **options) for keys, options in specs]
+        try:
+            db[collection].create_indexes(models)
+        except PyMongoError as e:
+            failures[collection] = str(e)
+    return failures
+
+def duplicate_vendors(db):
+    """Return {clerk_user_id: [vendor _id, ...]} for users with more than one vendor, oldest first"""
+    groups = db.vendors.aggregate([
+        {'$sort': {'createdAt': 1, '_id': 1}},
+        {'$group': {'_id': '$clerk_user_id', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+    ])
+    return {group['_id']: group['ids'] for group in groups}
+
+def dedupe_vendors(db):
+    """Delete duplicate vendors that own no data, keeping one per Clerk user
+
+    Returns {clerk_user_id: [vendor _id, ...]} for users still left with
+    several vendors because more than one owns data; those need merging by hand
+    """
+    unresolved = {}
+    for user_id, ids in duplicate_vendors(db).items():
+        owners = [vendor_id for vendor_id in ids
+                  if any(db[collection].find_one({'vendor_id': str(vendor_id)}, {'_id': 1})
+                         for collection in VENDOR_DATA)]
+        # Keep the vendor that owns data, or the oldest when none does
+        keep = owners or ids[:1]
+        db.vendors.delete_many({'_id': {'$in': [vendor_id for vendor_id in ids if vendor_id not in keep]}})
+        if len(keep) > 1:
+            unresolved[user_id] = keep
+    return unresolved
+
+def covers(index_keys, equality, range_field):
+    """Whether an index with these key fields serves the query shape"""
+    fields = [field for field, _ in index_keys]
+    if set(fields[:len(equality)]) != set(equality):
+        return False
+    if range_field is None:
+        return True
+    return len(fields) > len(equality) and fields[len(equality)] == range_field
+
+def uncovered_shapes(index_keys_by_collection, shapes=QUERY_SHAPES):
+    """Return the shapes no index in {collection: [index keys]} serves"""
+    uncovered = []
+    for collection, equality, range_field in shapes:
+        if '_id' in equality:
+            continue
+        candidates = index_keys_by_collection.get(collection, [])
+        if not any(covers(keys, equality, range_field) for keys in candidates):
+            uncovered.append((collection, equality, range_field))
+    return uncovered
+
+def declared_index_keys():
+    return {collection: [keys for keys, _ in specs] for collection, specs in INDEXES.items()}
+
+def live_index_keys(db):
+    """Read the index keys that actually exist in the database"""
+    existing = {}
+    for collection in {shape[0] for shape in QUERY_SHAPES}:
+        info = db[collection].index_information()
+        existing[collection] = [spec['key'] for spec in info.values()]
+    return existing
+
+def main():
+    from app import mongo
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ('ensure', 'check', 'dedupe'):
+        print(__doc__)
+        sys.exit(1)
+    if not mongo:
+        print("MongoDB not connected!")
+        sys.exit(1)
+
+    if sys.argv[1] == 'ensure':
+        failures = ensure_indexes(mongo.db)
+        for collection, error in failures.items():
+            print(f"{collection}: {error}")
+        print(f"Ensured indexes on {len(INDEXES) - len(failures)} of {len(INDEXES)} collections")
+        sys.exit(1 if failures else 0)
+
+    if sys.argv[1] == 'dedupe':
+        unresolved = dedupe_vendors(mongo.db)
+        for user_id, ids in unresolved.items():
+            print(f"{user_id}: {len(ids)} vendors own data, merge by hand: {', '.join(map(str, ids))}")
+        print(f"{len(unresolved)} Clerk user(s) still have duplicate vendors")
+        sys.exit(1 if unresolved else 0)
+
+    uncovered = uncovered_shapes(live_index_keys(mongo.db))
+    for collection, equality, range_field in uncovered:
+        suffix = f" then {range_field}" if range_field else ''
+        print(f"{collection}: {', '.join(equality)}{suffix}")
+    print(f"{len(uncovered)} query shape(s) without a supporting index")
+    duplicates = duplicate_vendors(mongo.db)
+    for user_id, ids in duplicates.items():
+        print(f"duplicate vendors for {user_id}: {', '.join(map(str, ids))}")
+    if duplicates:
+        print(f"{len(duplicates)} Clerk user(s) with duplicate vendors; run `python indexes.py dedupe`")
+    sys.exit(1 if uncovered or duplicates else 0)
+
+if __name__ == '__main__':
+    main()
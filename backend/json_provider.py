@@ -0,0 +1,78 @@
+"""
+JSON serialization for the Vendor Operations Dashboard
+A Flask JSON provider built on orjson that encodes MongoDB documents as
+they come off the cursor: ObjectIds anywhere in a document become strings,
+datetimes become ISO 8601 UTC timestamps and Decimal128 becomes a number.
+Without orjson it falls back to the standard library with the same rules
+
+Usage: app.json = MongoJSONProvider(app)
+"""
+
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from bson import Decimal128, ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def default(value):
+    """Encode the BSON and Python types JSON has no native form for"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        # Stored datetimes are naive UTC (datetime.utcnow())
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+class MongoJSONProvider(JSONProvider):
+    """Flask JSON provider that serializes MongoDB documents without a pre-pass"""
+
+    mimetype = 'application/json'
+    compact = None
+
+    def _indent(self):
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def dumps_bytes(self, obj, indent=False):
+        if orjson is None:
+            return self._dumps_stdlib(obj, indent=2 if indent else None).encode('utf-8')
+        return orjson.dumps(obj, default=default, option=OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return self._dumps_stdlib(obj, **kwargs)
+        return orjson.dumps(obj, default=default, option=OPTIONS).decode('utf-8')
+
+    @staticmethod
+    def _dumps_stdlib(obj, **kwargs):
+        kwargs.setdefault('default', default)
+        kwargs.setdefault('ensure_ascii', False)
+        kwargs.setdefault('separators', (',', ': ') if kwargs.get('indent') else (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj, self._indent()), mimetype=self.mimetype)
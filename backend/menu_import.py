@@ -0,0 +1,155 @@
+"""
+Menu import for the Vendor Operations Dashboard
+Reads an uploaded CSV (or XLSX, when openpyxl is installed) one row at a
+time, validates each row into the same document create_menu writes and
+inserts them in unordered batches, reporting errors by spreadsheet row
+
+Configuration (environment):
+    IMPORT_BATCH_SIZE   menus per insert_many, default 500
+"""
+
+import csv
+import io
+import os
+import re
+from datetime import date
+
+from pymongo.errors import BulkWriteError
+
+from bulk_writes import MENU_FIELDS, menu_document
+
+BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+MAX_REPORTED_ERRORS = 200
+
+MEAL_TYPES = ('breakfast', 'lunch', 'dinner')
+AVAILABILITY = ('daily', 'weekly', 'custom')
+TRUE_VALUES = ('true', 'yes', 'y', '1', 'published')
+FALSE_VALUES = ('false', 'no', 'n', '0', '', 'draft')
+
+# Header cells are matched ignoring case, spaces, dashes and underscores
+_COLUMNS = {re.sub(r'[^a-z0-9]', '', field.lower()): field for field in MENU_FIELDS}
+
+def column_for(header):
+    return _COLUMNS.get(re.sub(r'[^a-z0-9]', '', str(header or '').lower()))
+
+def iter_csv_rows(stream):
+    """Yield (row number, [cells]) from a binary CSV stream, header first"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    for number, cells in enumerate(csv.reader(text), start=1):
+        yield number, cells
+
+def iter_xlsx_rows(stream):
+    """Yield (row number, [cells]) from the first sheet of an XLSX workbook"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('XLSX import needs openpyxl; upload a CSV instead')
+
+    # read_only mode streams rows from the zip instead of building the sheet
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for number, cells in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield number, ['' if cell is None else cell for cell in cells]
+    finally:
+        workbook.close()
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+def _date(value, name):
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    value = _text(value)
+    if value:
+        try:
+            date.fromisoformat(value[:10])
+        except ValueError:
+            raise ValueError(f'{name} must be a YYYY-MM-DD date')
+        return value[:10]
+    return ''
+
+def validate_row(values):
+    """Turn {field: cell} into create_menu input, raising ValueError on bad cells"""
+    data = {'name': _text(values.get('name'))}
+    if not data['name']:
+        raise ValueError('name is required')
+
+    try:
+        price = float(_text(values.get('price')) or 0)
+    except ValueError:
+        raise ValueError('price must be a number')
+    if price < 0:
+        raise ValueError('price must not be negative')
+    data['price'] = price
+
+    data['mealType'] = _text(values.get('mealType')).lower() or 'breakfast'
+    if data['mealType'] not in MEAL_TYPES:
+        raise ValueError(f"mealType must be one of {', '.join(MEAL_TYPES)}")
+    data['availability'] = _text(values.get('availability')).lower() or 'daily'
+    if data['availability'] not in AVAILABILITY:
+        raise ValueError(f"availability must be one of {', '.join(AVAILABILITY)}")
+
+    published = values.get('isPublished')
+    if isinstance(published, bool):
+        data['isPublished'] = published
+    elif _text(published).lower() in TRUE_VALUES:
+        data['isPublished'] = True
+    elif _text(published).lower() in FALSE_VALUES:
+        data['isPublished'] = False
+    else:
+        raise ValueError('isPublished must be true or false')
+
+    data['startDate'] = _date(values.get('startDate'), 'startDate')
+    data['endDate'] = _date(values.get('endDate'), 'endDate')
+    for field in ('description', 'category', 'imageUrl'):
+        data[field] = _text(values.get(field))
+    return data
+
+def import_menus(collection, vendor_id, rows, batch_size=BATCH_SIZE, prepare=None):
+    """Validate and insert menus from (row number, cells) pairs; returns a report"""
+    prepare = prepare or (lambda data: data)
+    report = {'imported': 0, 'failed': 0, 'errors': [], 'ignoredColumns': []}
+
+    def error(number, message):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': number, 'error': message})
+
+    def flush(batch):
+        if not batch:
+            return
+        try:
+            collection.insert_many([document for _, document in batch], ordered=False)
+            report['imported'] += len(batch)
+        except BulkWriteError as e:
+            write_errors = e.details.get('writeErrors', [])
+            report['imported'] += len(batch) - len(write_errors)
+            for write_error in write_errors:
+                error(batch[write_error['index']][0], write_error['errmsg'])
+        batch.clear()
+
+    rows = iter(rows)
+    _, header = next(rows, (1, None))
+    if not header:
+        raise ValueError('The file is empty')
+    columns = [column_for(cell) for cell in header]
+    if 'name' not in columns:
+        raise ValueError('The header row needs a name column')
+    report['ignoredColumns'] = [_text(cell) for cell, column in zip(header, columns)
+                                if column is None and _text(cell)]
+
+    batch = []
+    for number, cells in rows:
+        if not any(_text(cell) for cell in cells):
+            continue
+        values = {column: cell for column, cell in zip(columns, cells) if column}
+        try:
+            batch.append((number, menu_document(vendor_id, prepare(validate_row(values)))))
+        except ValueError as e:
+            error(number, str(e))
+            continue
+        if len(batch) >= batch_size:
+            flush(batch)
+    flush(batch)
+    return report
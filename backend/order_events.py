@@ -0,0 +1,19 @@
+"""
+Order write hooks for the Vendor Operations Dashboard
+Every code path that inserts an order or changes its status calls these so
+the materialized dashboard data stays in step with the orders collection
+"""
+
+import daily_rollups
+import dish_stats
+import vendor_stats
+
+def order_created(db, order):
+    """Call after an order document has been inserted"""
+    vendor_stats.record_order_created(db, order)
+    daily_rollups.record_order_created(db, order)
+    dish_stats.record_order_created(db, order)
+
+def order_status_changed(db, order, old_status):
+    """Call after an order's status moved from old_status to order['status']"""
+    vendor_stats.record_order_status_change(db, order['vendor_id'], old_status, order.get('status'))
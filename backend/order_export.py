@@ -0,0 +1,161 @@
+"""
+Order export for the Vendor Operations Dashboard
+Streams a vendor's orders for a date range from the MongoDB cursor to the
+client as CSV or NDJSON, one line per order item, optionally gzipped on the
+fly. Parquet output (needs pyarrow) is written in row groups to a temporary
+file and then streamed, so memory stays constant for every format
+"""
+
+import csv
+import io
+import json
+import re
+import tempfile
+import zlib
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+COLUMNS = ['orderId', 'createdAt', 'status', 'customerName', 'customerEmail', 'customerPhone',
+           'deliveryAddress', 'totalAmount', 'itemName', 'itemQuantity', 'itemPrice', 'lineTotal']
+PROJECTION = {'createdAt': 1, 'status': 1, 'customerName': 1, 'customerEmail': 1,
+              'customerPhone': 1, 'deliveryAddress': 1, 'totalAmount': 1, 'items': 1}
+SORT = [('createdAt', 1), ('_id', 1)]
+
+CHUNK_BYTES = 64 * 1024
+# Customer-supplied text starting with these is read as a formula by Excel and Sheets
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+PARQUET_ROW_GROUP = 10000
+
+def parse_export_args(args):
+    """Return (format, gzip) from ?format= and ?gzip="""
+    export_format = args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if not args.get('from'):
+        raise ValueError('from is required, e.g. ?from=2026-01-01&to=2026-01-31')
+    compress = args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    if compress and export_format == 'parquet':
+        raise ValueError('Parquet files are already compressed; drop gzip')
+    return export_format, compress
+
+def order_lines(orders):
+    """Flatten orders into one row dict per item; orders without items give one row"""
+    for order in orders:
+        created = order.get('createdAt')
+        base = {
+            'orderId': str(order['_id']),
+            'createdAt': created.isoformat() if created else None,
+            'status': order.get('status'),
+            'customerName': order.get('customerName'),
+            'customerEmail': order.get('customerEmail'),
+            'customerPhone': order.get('customerPhone'),
+            'deliveryAddress': order.get('deliveryAddress'),
+            'totalAmount': order.get('totalAmount'),
+        }
+        items = order.get('items') or [{}]
+        for item in items:
+            quantity = item.get('quantity')
+            price = item.get('price')
+            yield {
+                **base,
+                'itemName': item.get('name'),
+                'itemQuantity': quantity,
+                'itemPrice': price,
+                'lineTotal': quantity * price if quantity is not None and price is not None else None,
+            }
+
+def csv_cell(value):
+    """A cell value spreadsheets will not evaluate as a formula"""
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def iter_csv(lines):
+    """Yield CSV text in chunks of roughly CHUNK_BYTES"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for line in lines:
+        writer.writerow([csv_cell(line[column]) for column in COLUMNS])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def iter_ndjson(lines):
+    chunk = []
+    size = 0
+    for line in lines:
+        text = json.dumps(line) + '\n'
+        chunk.append(text)
+        size += len(text)
+        if size >= CHUNK_BYTES:
+            yield ''.join(chunk)
+            chunk, size = [], 0
+    yield ''.join(chunk)
+
+def gzipped(chunks):
+    """Compress a stream of text chunks into a gzip stream as they arrive"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def iter_parquet(lines):
+    """Write row groups to a temporary file, then stream the finished file"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError('Parquet export needs pyarrow; use format=csv or ndjson')
+
+    schema = pa.schema([
+        ('orderId', pa.string()), ('createdAt', pa.string()), ('status', pa.string()),
+        ('customerName', pa.string()), ('customerEmail', pa.string()),
+        ('customerPhone', pa.string()), ('deliveryAddress', pa.string()),
+        ('totalAmount', pa.float64()), ('itemName', pa.string()), ('itemQuantity', pa.float64()),
+        ('itemPrice', pa.float64()), ('lineTotal', pa.float64()),
+    ])
+
+    def generate():
+        with tempfile.TemporaryFile() as sink:
+            with pq.ParquetWriter(sink, schema) as writer:
+                group = []
+                for line in lines:
+                    group.append(line)
+                    if len(group) >= PARQUET_ROW_GROUP:
+                        writer.write_table(pa.Table.from_pylist(group, schema))
+                        group = []
+                if group:
+                    writer.write_table(pa.Table.from_pylist(group, schema))
+            sink.seek(0)
+            while True:
+                data = sink.read(CHUNK_BYTES)
+                if not data:
+                    break
+                yield data
+
+    return generate()
+
+def export_body(orders, export_format, compress=False):
+    """The response body iterator for an export"""
+    lines = order_lines(orders)
+    if export_format == 'parquet':
+        return iter_parquet(lines)
+    chunks = iter_csv(lines) if export_format == 'csv' else iter_ndjson(lines)
+    if compress:
+        return gzipped(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks)
+
+def export_filename(args, export_format, compress=False):
+    span = '_'.join(re.sub(r'[^\w-]', '-', value) for value in (args.get('from'), args.get('to')) if value)
+    name = f"orders_{span}.{EXPORT_FORMATS[export_format][1]}"
+    return name + '.gz' if compress else name
@@ -0,0 +1,102 @@
+"""
+Order list queries for the Vendor Operations Dashboard
+Server-side filters and keyset pagination on (createdAt, _id), newest first,
+so a page costs the same no matter how long the vendor's history is. Bare
+from/to dates and times are read in the vendor's timezone, like the charts
+"""
+
+import base64
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from timeseries import get_zone
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+SORT = [('createdAt', -1), ('_id', -1)]
+
+def encode_cursor(order):
+    """Opaque token pointing just past the given order"""
+    created = order.get('createdAt')
+    payload = {'t': created.isoformat() if created else None, 'i': str(order['_id'])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        created = datetime.fromisoformat(payload['t']) if payload['t'] else None
+        return created, ObjectId(payload['i'])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError('Invalid cursor')
+
+def _parse_datetime(value, name, zone, end_of_day=False):
+    """Parse a bound as naive UTC, reading values without an offset in zone"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an ISO date or datetime')
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=zone)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+def parse_limit(args):
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_LIMIT}')
+    return limit
+
+def order_filter(vendor_id, args, timezone_name=None):
+    """Translate ?status=&from=&to=&customer= into a MongoDB filter"""
+    query = {'vendor_id': vendor_id}
+
+    statuses = [status for status in args.get('status', '').split(',') if status and status != 'all']
+    if len(statuses) == 1:
+        query['status'] = statuses[0]
+    elif statuses:
+        query['status'] = {'$in': statuses}
+
+    created = {}
+    zone = get_zone(timezone_name)
+    if args.get('from'):
+        created['$gte'] = _parse_datetime(args['from'], 'from', zone)
+    if args.get('to'):
+        # A bare date as the upper bound includes that whole day
+        created['$lt' if len(args['to']) == 10 else '$lte'] = _parse_datetime(args['to'], 'to', zone, True)
+    if created:
+        query['createdAt'] = created
+
+    customer = args.get('customer', '').strip()
+    if customer:
+        if '@' in customer:
+            query['customerEmail'] = customer
+        else:
+            query['customerName'] = {'$regex': '^' + re.escape(customer), '$options': 'i'}
+
+    return query
+
+def after_cursor(query, token):
+    """Restrict a filter to orders strictly after the cursor in SORT order"""
+    created, last_id = decode_cursor(token)
+    keyset = {'$or': [
+        {'createdAt': {'$lt': created}},
+        {'createdAt': created, '_id': {'$lt': last_id}}
+    ]}
+    return {'$and': [query, keyset]}
+
+def fetch_page(collection, query, limit, cursor=None, projection=None):
+    """Return (orders, next_cursor) for one page"""
+    if cursor:
+        query = after_cursor(query, cursor)
+    orders = list(collection.find(query, projection).sort(SORT).limit(limit + 1))
+    next_cursor = encode_cursor(orders[limit - 1]) if len(orders) > limit else None
+    return orders[:limit], next_cursor
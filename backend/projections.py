@@ -0,0 +1,58 @@
+"""
+Field projections for the Vendor Operations Dashboard read endpoints
+Turns ?fields=a,b,c into a MongoDB projection so only the requested fields
+leave the database. Without ?fields= each endpoint uses a lean default
+covering what its list view shows; ?fields=* returns whole documents.
+Hidden fields such as loginPassword are never returned
+"""
+
+import re
+
+FIELD_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+DEFAULT_FIELDS = {
+    'menus': ('name', 'description', 'price', 'category', 'mealType', 'availability',
+              'startDate', 'endDate', 'isPublished', 'imageUrl'),
+    'orders': ('customerName', 'customerEmail', 'customerPhone', 'status', 'totalAmount',
+               'createdAt', 'items.name', 'items.quantity', 'items.price'),
+    'subscriptions': ('planName', 'description', 'price', 'duration', 'features', 'isActive',
+                      'subscriberCount', 'createdAt'),
+    'staff': ('name', 'phone', 'email', 'vehicleType', 'vehicleNumber', 'status', 'isActive',
+              'address', 'assignedZone', 'licenseNumber', 'assignedOrders', 'createdAt'),
+    'vendor': ('businessName', 'ownerName', 'email', 'phone', 'address', 'description',
+               'profilePicture', 'timezone', 'upiId', 'qrCodeUrl', 'paymentEnabled'),
+}
+
+HIDDEN_FIELDS = {
+    'staff': ('loginPassword',),
+}
+
+def _hidden(resource, field):
+    return any(field == hidden or field.startswith(hidden + '.')
+               for hidden in HIDDEN_FIELDS.get(resource, ()))
+
+def full_projection(resource):
+    """Projection for a whole document minus its hidden fields; None when nothing is hidden"""
+    hidden = HIDDEN_FIELDS.get(resource)
+    return {field: 0 for field in hidden} if hidden else None
+
+def parse_fields(args, resource, required=()):
+    """Build the projection for ?fields= on a resource; None means every field"""
+    value = args.get('fields')
+    if value is None or value.strip() == '':
+        fields = list(DEFAULT_FIELDS[resource])
+    elif value.strip() == '*':
+        return full_projection(resource)
+    else:
+        fields = [field.strip() for field in value.split(',') if field.strip()]
+        for field in fields:
+            if not FIELD_PATTERN.match(field):
+                raise ValueError(f'Invalid field name: {field}')
+            if _hidden(resource, field):
+                raise ValueError(f'{field} cannot be requested')
+
+    fields += [field for field in required if field not in fields]
+    # MongoDB rejects a projection holding both a path and one of its sub-paths
+    kept = [field for field in fields
+            if not any(field.startswith(other + '.') for other in fields)]
+    return dict.fromkeys(kept, 1)
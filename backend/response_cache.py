@@ -0,0 +1,176 @@
+"""
+Per-vendor response cache for the Vendor Operations Dashboard
+Caches serialized JSON bodies of read endpoints keyed by vendor, scope and
+request path. Writes bump the (vendor, scope) generation, which changes the
+key of every entry in that scope so stale bodies are never read again
+
+The app passes in the generation from the shared vendor_versions document
+(see etags.py), so a write on one worker retires the entries of every other.
+The backend's own counter is only a fallback: with the memory backend it
+lives in one process and is only correct when a single process serves requests
+
+Configuration (environment):
+    CACHE_BACKEND       memory (default), redis or off
+    CACHE_REDIS_URL     redis://... URL when CACHE_BACKEND=redis
+    CACHE_TTL_SECONDS   entry lifetime, default 30
+    CACHE_MAX_ENTRIES   in-process LRU size, default 1024
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after a TTL"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # Counters live outside the LRU: evicting one would reset a generation
+    # and could resurrect entries cached under an older value
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisCache:
+    """Redis-compatible backend so several workers share one cache"""
+
+    name = 'redis'
+
+    def __init__(self, url, ttl=30, prefix='vendor-dashboard:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=self.ttl if ttl is None else ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def counter(self, key):
+        value = self.client.get(self.prefix + 'counter:' + key)
+        return int(value) if value else 0
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + 'counter:' + key)
+
+    def __len__(self):
+        return self.client.dbsize()
+
+class ResponseCache:
+    """Generation-keyed cache of response bodies with hit/miss accounting"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    def _count(self, counts, scope):
+        with self._lock:
+            counts[scope] = counts.get(scope, 0) + 1
+
+    def key(self, vendor_id, scope, route, generation=None):
+        if generation is None:
+            generation = self.backend.counter(f'{vendor_id}:{scope}')
+        return f'{vendor_id}:{scope}:{generation}:{route}'
+
+    def get_or_build(self, vendor_id, scope, route, build, generation=None):
+        """Return the cached body for route, calling build() to produce it on a miss
+
+        A generation read from shared storage replaces the backend's own counter
+        """
+        if self.backend is None:
+            return build()
+        key = self.key(vendor_id, scope, route, generation)
+        body = self.backend.get(key)
+        if body is not None:
+            self._count(self.hits, scope)
+            return body
+        self._count(self.misses, scope)
+        body = build()
+        self.backend.set(key, body)
+        return body
+
+    def invalidate(self, vendor_id, *scopes):
+        if self.backend is None:
+            return
+        for scope in scopes:
+            self.backend.incr(f'{vendor_id}:{scope}')
+
+    def stats(self):
+        with self._lock:
+            scopes = sorted(set(self.hits) | set(self.misses))
+            per_scope = {
+                scope: {'hits': self.hits.get(scope, 0), 'misses': self.misses.get(scope, 0)}
+                for scope in scopes
+            }
+        hits = sum(scope['hits'] for scope in per_scope.values())
+        misses = sum(scope['misses'] for scope in per_scope.values())
+        return {
+            'backend': self.backend.name if self.backend is not None else 'off',
+            'entries': len(self.backend) if self.backend is not None else 0,
+            'hits': hits,
+            'misses': misses,
+            'hitRate': round(hits / (hits + misses), 4) if hits + misses else 0,
+            'scopes': per_scope
+        }
+
+def create_response_cache():
+    """Build the cache configured by the environment"""
+    backend_name = os.environ.get('CACHE_BACKEND', 'memory').lower()
+    ttl = int(os.environ.get('CACHE_TTL_SECONDS', '30'))
+
+    if backend_name == 'off':
+        return ResponseCache(None)
+    if backend_name == 'redis':
+        try:
+            return ResponseCache(RedisCache(os.environ['CACHE_REDIS_URL'], ttl=ttl))
+        except (ImportError, KeyError) as e:
+            print(f"⚠ Redis cache unavailable ({e}), using in-process cache")
+    return ResponseCache(TTLCache(int(os.environ.get('CACHE_MAX_ENTRIES', '1024')), ttl))
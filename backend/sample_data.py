@@ -4,6 +4,9 @@ Run this script to populate the database with sample data for testing
 """
 
 from app import app, mongo
+from vendor_stats import rebuild_vendor_stats
+from daily_rollups import rebuild_daily_rollups
+from dish_stats import rebuild_dish_stats
 from datetime import datetime, timedelta
 import random
 
@@ -15,6 +18,10 @@ def create_sample_data():
         mongo.db.orders.drop()
         mongo.db.subscriptions.drop()
         mongo.db.delivery_staff.drop()
+        mongo.db.vendor_stats.drop()
+        mongo.db.daily_rollups.drop()
+        mongo.db.dish_stats.drop()
+        mongo.db.dish_daily_stats.drop()
         
         # Create sample vendor
         vendor_data = {
@@ -227,6 +234,9 @@ def create_sample_data():
             orders.append(order)
         
         mongo.db.orders.insert_many(orders)
+        rebuild_vendor_stats(mongo.db, vendor_id)
+        rebuild_daily_rollups(mongo.db, vendor_id)
+        rebuild_dish_stats(mongo.db, vendor_id)
         
         print("Sample data created successfully!")
         print(f"Created:")
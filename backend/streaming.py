@@ -0,0 +1,57 @@
+"""
+Streaming list responses for the Vendor Operations Dashboard
+Writes documents to the client as the MongoDB cursor yields them instead of
+building the whole list first, so memory stays flat however long the list is
+
+A request streams when it asks for NDJSON (Accept: application/x-ndjson) or
+passes ?stream=1, which returns a chunked JSON array
+
+Configuration (environment):
+    STREAM_BATCH_SIZE   documents fetched per cursor round trip, default 500
+"""
+
+import os
+
+from flask import stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+NDJSON_MIMETYPES = (NDJSON_MIMETYPE, 'application/ndjson', 'application/jsonl')
+JSON_MIMETYPE = 'application/json'
+
+BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', '500'))
+
+def stream_format(request):
+    """Return 'ndjson', 'json' or None when the request wants a buffered body"""
+    accepted = request.accept_mimetypes
+    best = accepted.best_match((JSON_MIMETYPE,) + NDJSON_MIMETYPES)
+    if best in NDJSON_MIMETYPES:
+        return 'ndjson'
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return 'json'
+    return None
+
+def iter_json_array(docs, dumps):
+    """Yield a JSON array one element at a time"""
+    yield '['
+    first = True
+    for doc in docs:
+        yield ('' if first else ',') + dumps(doc)
+        first = False
+    yield ']'
+
+def iter_ndjson(docs, dumps):
+    """Yield one JSON document per line"""
+    for doc in docs:
+        yield dumps(doc) + '\n'
+
+def stream_cursor(app, cursor, fmt, batch_size=BATCH_SIZE):
+    """Build a streamed response that drains the cursor in batch_size round trips"""
+    cursor = cursor.batch_size(batch_size)
+    if fmt == 'ndjson':
+        body, mimetype = iter_ndjson(cursor, app.json.dumps), NDJSON_MIMETYPE
+    else:
+        body, mimetype = iter_json_array(cursor, app.json.dumps), JSON_MIMETYPE
+    response = app.response_class(stream_with_context(body), mimetype=mimetype)
+    # Proxies such as nginx would otherwise buffer the whole body
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,105 @@
+"""
+Delta sync for the Vendor Operations Dashboard
+Polling clients send back the syncToken from their previous call and get
+only the menus, subscriptions, staff and orders whose updatedAt moved past
+it, plus tombstones for documents deleted since. Deletions are logged in
+the deletions collection, which MongoDB expires after the retention window
+
+Configuration (environment):
+    DELETION_RETENTION_DAYS   how long tombstones are kept, default 30
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from projections import parse_fields
+
+# Resource name (as in ?resources= and projections) -> collection
+RESOURCES = {
+    'menus': 'menus',
+    'subscriptions': 'subscriptions',
+    'staff': 'delivery_staff',
+    'orders': 'orders',
+}
+DELETION_RETENTION = timedelta(days=int(os.environ.get('DELETION_RETENTION_DAYS', '30')))
+MAX_CHANGES = 1000
+# Writes stamp updatedAt before they commit; re-sending this window catches ones
+# still in flight when the previous poll ran. Clients upsert by _id, so repeats are harmless
+OVERLAP = timedelta(seconds=5)
+
+def record_deletion(db, vendor_id, resource, doc_ids):
+    """Log tombstones for deleted documents"""
+    now = datetime.utcnow()
+    tombstones = [{'vendor_id': vendor_id, 'resource': resource, 'docId': str(doc_id), 'deletedAt': now}
+                  for doc_id in doc_ids]
+    if tombstones:
+        db.deletions.insert_many(tombstones)
+
+def parse_since(value):
+    """The naive UTC datetime of ?since=, or None for a full sync"""
+    if not value:
+        return None
+    try:
+        since = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError('since must be an ISO timestamp or a syncToken')
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+def parse_resources(args):
+    value = args.get('resources')
+    if not value:
+        return list(RESOURCES)
+    resources = [resource.strip() for resource in value.split(',') if resource.strip()]
+    unknown = [resource for resource in resources if resource not in RESOURCES]
+    if unknown:
+        raise ValueError(f"Unknown resource(s): {', '.join(unknown)}")
+    return resources
+
+def sync(db, vendor_id, resources, since=None, now=None, limit=MAX_CHANGES):
+    """Changes and tombstones after `since` (everything when None)"""
+    now = now or datetime.utcnow()
+    reset = since is not None and since < now - DELETION_RETENTION
+    if reset:
+        # Tombstones older than the retention window are gone; start over
+        since = None
+
+    next_since = now - OVERLAP
+    has_more = False
+    changes = {}
+    for resource in resources:
+        query = {'vendor_id': vendor_id}
+        if since is not None:
+            query['updatedAt'] = {'$gte': since}
+        projection = parse_fields({}, resource, required=('updatedAt',))
+        collection = db[RESOURCES[resource]]
+        docs = list(collection.find(query, projection).sort([('updatedAt', 1), ('_id', 1)]).limit(limit + 1))
+        if len(docs) > limit:
+            docs = docs[:limit]
+            has_more = True
+            boundary = docs[-1].get('updatedAt')
+            if boundary is not None:
+                # Finish the boundary millisecond so resuming just past it skips nothing
+                sent = [doc['_id'] for doc in docs if doc.get('updatedAt') == boundary]
+                docs += collection.find({**query, 'updatedAt': boundary, '_id': {'$nin': sent}}, projection)
+                next_since = min(next_since, boundary + timedelta(milliseconds=1))
+        changes[resource] = docs
+
+    deleted = {resource: [] for resource in resources if resource != 'orders'}
+    if since is not None and deleted:
+        tombstones = db.deletions.find(
+            {'vendor_id': vendor_id, 'deletedAt': {'$gte': since}, 'resource': {'$in': list(deleted)}},
+            {'resource': 1, 'docId': 1}
+        )
+        for tombstone in tombstones:
+            deleted[tombstone['resource']].append(tombstone['docId'])
+
+    return {
+        'full': since is None,
+        'reset': reset,
+        'hasMore': has_more,
+        'syncToken': next_since.isoformat(),
+        'changes': changes,
+        'deleted': deleted,
+    }
@@ -0,0 +1,110 @@
+"""
+Route-level tests for app.py, run against mongomock
+"""
+
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import jwt
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+pytest.importorskip('cryptography')
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import app as app_module
+from auth import JWKSCache, TokenVerifier
+from response_cache import ResponseCache, TTLCache
+
+KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+JWK = {**jwt.algorithms.RSAAlgorithm.to_jwk(KEY.public_key(), as_dict=True), 'kid': 'test'}
+
+def auth_headers(sub='user_1'):
+    token = jwt.encode({'sub': sub, 'exp': int(time.time()) + 600}, KEY, algorithm='RS256',
+                       headers={'kid': 'test'})
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def client(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr(app_module, 'mongo', SimpleNamespace(db=db))
+    monkeypatch.setattr(app_module, 'token_verifier', TokenVerifier(JWKSCache(lambda: {'keys': [JWK]})))
+    monkeypatch.setattr(app_module, 'vendor_id_cache', app_module.TTLCache())
+    return app_module.app.test_client()
+
+def test_revenue_chart_returns_one_bucket_per_day(client):
+    response = client.get('/api/dashboard/revenue?from=2026-03-01&to=2026-03-07', headers=auth_headers())
+    assert response.status_code == 200, response.get_json()
+    assert [day['date'] for day in response.get_json()] == [f'2026-03-0{day}' for day in range(1, 8)]
+    assert all(day['revenue'] == 0 for day in response.get_json())
+
+def test_orders_chart_returns_orders_and_items_per_day(client):
+    response = client.get('/api/dashboard/orders', headers=auth_headers())
+    assert response.status_code == 200, response.get_json()
+    days = response.get_json()
+    assert days and all(set(day) == {'date', 'orders', 'items'} for day in days)
+
+def test_orders_chart_reads_both_metrics_in_one_pass(client, monkeypatch):
+    db = app_module.mongo.db
+    vendor_id = str(db.vendors.insert_one({'clerk_user_id': 'user_1'}).inserted_id)
+    db.daily_rollups.insert_one({'vendor_id': vendor_id, 'date': datetime(2026, 3, 2), 'orders': 3, 'items': 7})
+    reads = []
+    find = db.daily_rollups.find
+    monkeypatch.setattr(db.daily_rollups, 'find', lambda *args, **kwargs: reads.append(args) or find(*args, **kwargs))
+
+    response = client.get('/api/dashboard/orders?from=2026-03-01&to=2026-03-03', headers=auth_headers())
+
+    assert response.get_json() == [{'date': '2026-03-01', 'orders': 0, 'items': 0},
+                                   {'date': '2026-03-02', 'orders': 3, 'items': 7},
+                                   {'date': '2026-03-03', 'orders': 0, 'items': 0}]
+    assert len(reads) == 1
+
+def test_order_dates_follow_the_vendor_timezone(client):
+    db = app_module.mongo.db
+    vendor_id = str(db.vendors.insert_one({'clerk_user_id': 'user_1', 'timezone': 'Asia/Kolkata'}).inserted_id)
+    db.orders.insert_many([
+        {'vendor_id': vendor_id, 'customerName': 'early', 'createdAt': datetime(2026, 3, 1, 20, 0)},
+        {'vendor_id': vendor_id, 'customerName': 'next day', 'createdAt': datetime(2026, 3, 2, 20, 0)},
+    ])
+
+    response = client.get('/api/orders?from=2026-03-02&to=2026-03-02', headers=auth_headers())
+
+    assert [order['customerName'] for order in response.get_json()['orders']] == ['early']
+
+def test_unknown_image_variant_is_404_without_queueing(client, monkeypatch, tmp_path):
+    from image_store import LocalStore
+    from image_variants import VariantWorker
+
+    store = LocalStore(str(tmp_path))
+    worker = VariantWorker(app_module.mongo.db, store)
+    submitted = []
+    monkeypatch.setattr(worker, 'submit', submitted.append)
+    monkeypatch.setattr(app_module, 'image_store', store)
+    monkeypatch.setattr(app_module, 'variant_worker', worker)
+
+    response = client.get('/api/images/' + 'a' * 64 + '?size=thumb')
+
+    assert response.status_code == 404
+    assert submitted == []
+
+def test_chart_ranges_are_capped_at_366_days(client):
+    ok = client.get('/api/dashboard/revenue?from=2025-01-01&to=2026-01-01', headers=auth_headers())
+    too_long = client.get('/api/dashboard/orders?from=2024-01-01&to=2026-01-01', headers=auth_headers())
+    assert ok.status_code == 200 and len(ok.get_json()) == 366
+    assert too_long.status_code == 400
+
+def test_write_on_one_worker_is_seen_by_another(client, monkeypatch):
+    app_module.mongo.db.vendors.insert_one({'clerk_user_id': 'user_1'})
+    worker_a, worker_b = ResponseCache(TTLCache()), ResponseCache(TTLCache())
+
+    monkeypatch.setattr(app_module, 'response_cache', worker_b)
+    stale = client.get('/api/menus', headers=auth_headers())
+    monkeypatch.setattr(app_module, 'response_cache', worker_a)
+    client.post('/api/menus', json={'name': 'Dosa'}, headers=auth_headers())
+    monkeypatch.setattr(app_module, 'response_cache', worker_b)
+    fresh = client.get('/api/menus', headers=auth_headers())
+
+    assert stale.get_json() == []
+    assert [menu['name'] for menu in fresh.get_json()] == ['Dosa']
+    assert fresh.headers['ETag'] != stale.headers['ETag']
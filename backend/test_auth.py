@@ -0,0 +1,86 @@
+"""
+Tests for Clerk token verification against a locally generated key pair
+"""
+
+import time
+
+import jwt
+import pytest
+
+pytest.importorskip('cryptography')
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from auth import JWKSCache, TokenVerifier
+
+def make_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return private_key, {**jwk, 'kid': kid, 'use': 'sig', 'alg': 'RS256'}
+
+KEY, JWK = make_key('key-1')
+NEW_KEY, NEW_JWK = make_key('key-2')
+
+def sign(key=KEY, kid='key-1', **claims):
+    claims = {'sub': 'user_1', 'exp': int(time.time()) + 60, **claims}
+    return jwt.encode(claims, key, algorithm='RS256', headers={'kid': kid})
+
+class FakeJWKS:
+    """Serves a mutable key set and counts fetches"""
+
+    def __init__(self, *jwks):
+        self.keys = list(jwks)
+        self.fetches = 0
+
+    def __call__(self):
+        self.fetches += 1
+        return {'keys': list(self.keys)}
+
+@pytest.fixture
+def jwks():
+    return FakeJWKS(JWK)
+
+def test_valid_token_is_verified_once_then_served_from_cache(jwks):
+    verifier = TokenVerifier(JWKSCache(jwks))
+    token = sign(email='owner@example.com')
+
+    assert verifier.verify(token)['email'] == 'owner@example.com'
+    verifier.jwks = None  # a second signature check would fail
+    assert verifier.verify(token)['sub'] == 'user_1'
+    assert jwks.fetches == 1
+
+@pytest.mark.parametrize('token', [
+    'not-a-jwt',
+    sign(key=NEW_KEY),  # right kid, wrong key
+    sign(exp=int(time.time()) - 60),
+    jwt.encode({'sub': 'user_1', 'exp': int(time.time()) + 60}, 'secret', algorithm='HS256',
+               headers={'kid': 'key-1'}),
+])
+def test_bad_tokens_are_rejected(jwks, token):
+    with pytest.raises(jwt.InvalidTokenError):
+        TokenVerifier(JWKSCache(jwks)).verify(token)
+
+def test_issuer_and_authorized_party_are_enforced(jwks):
+    verifier = TokenVerifier(JWKSCache(jwks), issuer='https://clerk.example.com',
+                             authorized_parties=['https://app.example.com'])
+    assert verifier.verify(sign(iss='https://clerk.example.com', azp='https://app.example.com'))
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(sign(iss='https://evil.example.com'))
+    with pytest.raises(jwt.InvalidTokenError):
+        verifier.verify(sign(iss='https://clerk.example.com', azp='https://evil.example.com'))
+
+def test_unknown_kid_refetches_the_key_set(jwks):
+    cache = JWKSCache(jwks, min_refresh=0)
+    verifier = TokenVerifier(cache)
+    verifier.verify(sign())
+
+    jwks.keys.append(NEW_JWK)
+    assert verifier.verify(sign(key=NEW_KEY, kid='key-2'))['sub'] == 'user_1'
+    assert jwks.fetches == 2
+
+def test_unknown_kids_cannot_force_a_fetch_per_request(jwks):
+    verifier = TokenVerifier(JWKSCache(jwks, min_refresh=60))
+    verifier.verify(sign())
+    for _ in range(5):
+        with pytest.raises(jwt.InvalidTokenError):
+            verifier.verify(sign(key=NEW_KEY, kid='made-up'))
+    assert jwks.fetches == 1
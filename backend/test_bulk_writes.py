@@ -0,0 +1,50 @@
+"""
+Tests for the mixed insert/update/delete bulk runner
+"""
+
+import pytest
+
+from bulk_writes import MENU_FIELDS, menu_document, run_bulk
+
+mongomock = pytest.importorskip('mongomock')
+
+@pytest.fixture
+def menus():
+    collection = mongomock.MongoClient().db.menus
+    collection.create_index('name', unique=True)
+    return collection
+
+def test_mixed_operations_are_scoped_to_the_vendor(menus):
+    own = menus.insert_one(menu_document('v1', {'name': 'own'})).inserted_id
+    foreign = menus.insert_one(menu_document('v2', {'name': 'foreign'})).inserted_id
+    operations = [
+        {'op': 'insert', 'data': {'name': 'new'}},
+        {'op': 'update', '_id': str(own), 'data': {'name': 'renamed', 'vendor_id': 'v2'}},
+        {'op': 'delete', '_id': str(foreign)},
+    ]
+
+    results, summary = run_bulk(menus, 'v1', operations, False, menu_document, MENU_FIELDS)
+
+    assert [result['status'] for result in results] == ['created', 'updated', 'error']
+    assert summary['error'] == 1
+    assert menus.find_one({'_id': own})['vendor_id'] == 'v1'
+    assert menus.count_documents({'_id': foreign}) == 1
+
+def test_ordered_run_skips_everything_after_a_failure(menus):
+    operations = [
+        {'op': 'insert', 'data': {'name': 'a'}},
+        {'op': 'insert', 'data': {'name': 'a'}},
+        {'op': 'insert', 'data': {'name': 'b'}},
+    ]
+
+    ordered, _ = run_bulk(menus, 'v1', operations, True, menu_document, MENU_FIELDS)
+    assert [result['status'] for result in ordered] == ['created', 'error', 'skipped']
+
+    menus.delete_many({})
+    unordered, _ = run_bulk(menus, 'v1', operations, False, menu_document, MENU_FIELDS)
+    assert [result['status'] for result in unordered] == ['created', 'error', 'created']
+
+def test_invalid_items_are_reported_not_raised(menus):
+    operations = [{'op': 'update', '_id': 'nope'}, {'op': 'upsert'}, 'insert']
+    results, _ = run_bulk(menus, 'v1', operations, False, menu_document, MENU_FIELDS)
+    assert all(result['status'] == 'error' for result in results)
@@ -0,0 +1,79 @@
+"""
+Tests for the response compression middleware
+"""
+
+import gzip
+import json
+
+import pytest
+from flask import Flask, stream_with_context
+
+from compression import CompressionMiddleware, available_encodings
+
+ROWS = [{'id': i, 'name': f'menu {i}', 'description': 'freshly cooked'} for i in range(200)]
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+
+    @app.route('/big')
+    def big():
+        return ROWS
+
+    @app.route('/small')
+    def small():
+        return {'ok': True}
+
+    @app.route('/stream')
+    def stream():
+        def generate():
+            for row in ROWS:
+                yield json.dumps(row) + '\n'
+        return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    @app.route('/export.gz')
+    def export():
+        return app.response_class(gzip.compress(json.dumps(ROWS).encode()), mimetype='application/gzip')
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, encodings={'gzip': available_encodings()['gzip']})
+    return app
+
+def get(app, path, accept='gzip, deflate'):
+    return app.test_client().get(path, headers={'Accept-Encoding': accept})
+
+def test_buffered_json_is_gzipped_with_a_matching_length(app):
+    response = get(app, '/big')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert int(response.headers['Content-Length']) == len(response.data)
+    assert json.loads(gzip.decompress(response.data)) == ROWS
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+def test_streamed_body_is_compressed_without_a_length(app):
+    response = get(app, '/stream')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
+
+def test_small_unaccepted_and_binary_bodies_are_left_alone(app):
+    assert 'Content-Encoding' not in get(app, '/small').headers
+    assert 'Content-Encoding' not in get(app, '/big', accept='identity').headers
+    assert 'Content-Encoding' not in get(app, '/big', accept='br').headers
+    response = get(app, '/export.gz')
+    assert 'Content-Encoding' not in response.headers
+    assert json.loads(gzip.decompress(response.data)) == ROWS
+
+def test_stats_count_bytes_saved(app):
+    get(app, '/big')
+    get(app, '/small')
+    stats = app.wsgi_app.stats()
+    assert stats['compressed'] == 1 and stats['skipped'] == 1
+    assert stats['bytesSaved'] == stats['bytesIn'] - stats['bytesOut'] > 0
+
+def test_negotiation_prefers_zstd_then_brotli_and_honours_q():
+    middleware = CompressionMiddleware(None, encodings={'zstd': None, 'br': None, 'gzip': None})
+    assert middleware.negotiate('gzip, deflate, br, zstd') == 'zstd'
+    assert middleware.negotiate('gzip, br') == 'br'
+    assert middleware.negotiate('zstd;q=0, gzip') == 'gzip'
+    assert middleware.negotiate('identity') is None
+    assert middleware.negotiate(None) is None
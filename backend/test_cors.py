@@ -0,0 +1,56 @@
+"""
+Tests for the CORS middleware
+"""
+
+import pytest
+from flask import Flask
+
+from cors import CORSMiddleware
+
+PREFLIGHT = {'Origin': 'https://app.example.com', 'Access-Control-Request-Method': 'PUT',
+             'Access-Control-Request-Headers': 'authorization, content-type'}
+
+def make_app(origins):
+    app = Flask(__name__)
+    app.calls = 0
+
+    @app.route('/api/menus', methods=['GET', 'PUT'])
+    def menus():
+        app.calls += 1
+        return {'ok': True}
+
+    app.wsgi_app = CORSMiddleware(app.wsgi_app, origins, max_age=86400)
+    return app
+
+@pytest.fixture
+def app():
+    return make_app(['https://app.example.com'])
+
+def test_preflight_is_answered_without_reaching_flask(app):
+    response = app.test_client().options('/api/menus', headers=PREFLIGHT)
+    assert response.status_code == 204
+    assert response.headers['Access-Control-Allow-Origin'] == 'https://app.example.com'
+    assert 'Authorization' in response.headers['Access-Control-Allow-Headers']
+    assert 'PUT' in response.headers['Access-Control-Allow-Methods']
+    assert response.headers['Access-Control-Max-Age'] == '86400'
+    assert app.calls == 0
+
+def test_allowed_origin_gets_headers_once(app):
+    response = app.test_client().get('/api/menus', headers={'Origin': 'https://app.example.com'})
+    assert response.headers.getlist('Access-Control-Allow-Origin') == ['https://app.example.com']
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+    assert 'Origin' in response.headers.getlist('Vary')
+
+def test_other_origins_get_no_cors_headers(app):
+    client = app.test_client()
+    preflight = client.options('/api/menus', headers={**PREFLIGHT, 'Origin': 'https://evil.example.com'})
+    response = client.get('/api/menus', headers={'Origin': 'https://evil.example.com'})
+    for result in (preflight, response):
+        assert 'Access-Control-Allow-Origin' not in result.headers
+    assert response.json == {'ok': True}
+
+def test_wildcard_allows_any_origin_without_credentials():
+    app = make_app(['*'])
+    response = app.test_client().get('/api/menus', headers={'Origin': 'https://anywhere.example'})
+    assert response.headers['Access-Control-Allow-Origin'] == '*'
+    assert 'Access-Control-Allow-Credentials' not in response.headers
@@ -0,0 +1,44 @@
+"""
+Tests for the dashboard stats engine
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from dashboard_stats import compute_dashboard_stats, today_bounds, today_pipeline
+
+mongomock = pytest.importorskip('mongomock')
+
+NOW = datetime(2026, 3, 1, 15, 0)
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.orders.insert_many([
+        {'vendor_id': 'v1', 'totalAmount': 100.0, 'customerEmail': 'a@example.com', 'createdAt': NOW},
+        {'vendor_id': 'v1', 'totalAmount': 50.0, 'customerEmail': 'b@example.com',
+         'createdAt': NOW - timedelta(hours=16)},
+        {'vendor_id': 'v1', 'totalAmount': 70.0, 'customerEmail': 'a@example.com',
+         'createdAt': NOW - timedelta(days=3)},
+        {'vendor_id': 'v2', 'totalAmount': 999.0, 'customerEmail': 'c@example.com', 'createdAt': NOW},
+    ])
+    return db
+
+def test_today_range_is_in_the_leading_match():
+    start, end = NOW.replace(hour=0), NOW.replace(hour=0) + timedelta(days=1)
+    match = today_pipeline('v1', start, end)[0]['$match']
+    assert match == {'vendor_id': 'v1', 'createdAt': {'$gte': start, '$lt': end}}
+
+def test_today_figures_and_exact_customers(db):
+    stats = compute_dashboard_stats(db, 'v1', now=NOW, exact_customers=True)
+    assert stats['todayOrders'] == 1
+    assert stats['todayRevenue'] == 100.0
+    assert stats['totalCustomers'] == 2
+
+def test_today_is_the_vendor_local_day(db):
+    # 15:00 UTC is 20:30 in India, whose day began at 18:30 UTC the day before
+    assert today_bounds(NOW, 'Asia/Kolkata') == (datetime(2026, 2, 28, 18, 30), datetime(2026, 3, 1, 18, 30))
+    stats = compute_dashboard_stats(db, 'v1', now=NOW, timezone_name='Asia/Kolkata')
+    assert stats['todayOrders'] == 2
+    assert stats['todayRevenue'] == 150.0
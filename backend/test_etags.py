@@ -0,0 +1,34 @@
+"""
+Tests for version-based ETags
+"""
+
+import pytest
+
+from etags import WINDOW_SECONDS, bump_versions, current_version, make_etag
+
+mongomock = pytest.importorskip('mongomock')
+
+NOW = 1767225600
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient().db
+
+def test_versions_start_at_zero_and_bump_per_scope(db):
+    assert current_version(db, 'v1', 'menus') == 0
+
+    bump_versions(db, 'v1', ('menus', 'dashboard'))
+    bump_versions(db, 'v1', ('menus',))
+
+    assert current_version(db, 'v1', 'menus') == 2
+    assert current_version(db, 'v1', 'dashboard') == 1
+    assert current_version(db, 'v2', 'menus') == 0
+
+def test_etag_changes_with_version_route_and_window():
+    etag = make_etag('v1', 'menus', 3, '/api/menus?', now=NOW)
+
+    assert make_etag('v1', 'menus', 3, '/api/menus?', now=NOW + 1) == etag
+    assert make_etag('v1', 'menus', 4, '/api/menus?', now=NOW) != etag
+    assert make_etag('v1', 'menus', 3, '/api/menus?fields=name', now=NOW) != etag
+    assert make_etag('v2', 'menus', 3, '/api/menus?', now=NOW) != etag
+    assert make_etag('v1', 'menus', 3, '/api/menus?', now=NOW + WINDOW_SECONDS) != etag
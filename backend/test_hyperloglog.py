@@ -0,0 +1,41 @@
+"""
+Tests for the HyperLogLog customer sketches
+"""
+
+import hyperloglog
+
+def build(values):
+    sketch = {}
+    for value in values:
+        hyperloglog.add(sketch, value)
+    return sketch
+
+def test_small_counts_are_exact_enough():
+    sketch = build(f'customer{i}@example.com' for i in range(50))
+    assert abs(hyperloglog.estimate(sketch) - 50) <= 1
+
+def test_large_count_within_error_bound():
+    sketch = build(f'customer{i}@example.com' for i in range(100000))
+    # Standard error at 2048 registers is about 2.3%; allow three of them
+    assert abs(hyperloglog.estimate(sketch) - 100000) < 100000 * 0.07
+
+def test_duplicates_do_not_inflate_count():
+    once = build(f'customer{i}@example.com' for i in range(1000))
+    twice = build(f'customer{i % 1000}@example.com' for i in range(5000))
+    assert once == twice
+
+def test_merge_matches_union():
+    left = build(f'customer{i}@example.com' for i in range(0, 6000))
+    right = build(f'customer{i}@example.com' for i in range(4000, 10000))
+    union = build(f'customer{i}@example.com' for i in range(0, 10000))
+    assert hyperloglog.merge(left, right) == union
+
+def test_document_round_trip_and_max_update():
+    sketch = build(['a@example.com', 'b@example.com'])
+    assert hyperloglog.from_document(hyperloglog.to_document(sketch)) == sketch
+
+    index, rank = hyperloglog.register_for('a@example.com')
+    assert hyperloglog.max_update('customersHll', 'a@example.com') == {f'customersHll.{index}': rank}
+
+def test_empty_sketch_counts_zero():
+    assert hyperloglog.estimate({}) == 0
@@ -0,0 +1,42 @@
+"""
+Tests for image validation and the content-addressed local store
+"""
+
+import base64
+import hashlib
+
+import pytest
+
+import image_store
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 32
+
+def test_sniff_type_accepts_only_supported_formats():
+    assert image_store.sniff_type(PNG) == 'image/png'
+    assert image_store.sniff_type(b'\xff\xd8\xff\xe0rest') == 'image/jpeg'
+    assert image_store.sniff_type(b'RIFF\x00\x00\x00\x00WEBPVP8 ') == 'image/webp'
+    assert image_store.sniff_type(b'GIF89a') is None
+
+def test_externalize_stores_data_urls_once_by_hash(tmp_path):
+    store = image_store.LocalStore(str(tmp_path))
+    data_url = 'data:image/png;base64,' + base64.b64encode(PNG).decode()
+    digest = hashlib.sha256(PNG).hexdigest()
+
+    assert image_store.externalize(store, data_url) == '/api/images/' + digest
+    assert image_store.externalize(store, data_url) == '/api/images/' + digest
+    assert store.get(digest) == (PNG, 'image/png')
+    assert len(list(tmp_path.rglob('*'))) == 2  # one fan-out directory, one file
+
+def test_externalize_leaves_urls_alone(tmp_path):
+    store = image_store.LocalStore(str(tmp_path))
+    for value in ('', 'https://example.com/a.jpg', '/api/images/' + '0' * 64):
+        assert image_store.externalize(store, value) == value
+
+def test_invalid_images_are_rejected(tmp_path):
+    store = image_store.LocalStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        image_store.externalize(store, 'data:image/png;base64,not base64!')
+    with pytest.raises(ValueError):
+        image_store.store_image(store, b'plain text')
+    with pytest.raises(ValueError):
+        image_store.store_image(store, PNG + b'\x00' * image_store.MAX_IMAGE_BYTES)
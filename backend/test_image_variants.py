@@ -0,0 +1,59 @@
+"""
+Tests for variant selection and rendering
+"""
+
+import io
+
+import pytest
+
+import image_variants
+from image_store import LocalStore, store_image
+
+Image = pytest.importorskip('PIL.Image')
+
+def _jpeg(width, height):
+    output = io.BytesIO()
+    Image.effect_noise((width, height), 60).convert('RGB').save(output, 'JPEG', quality=95)
+    return output.getvalue()
+
+def test_parse_variant_by_name_or_width():
+    assert image_variants.parse_variant({}) is None
+    assert image_variants.parse_variant({'size': 'thumb'}) == 'thumb'
+    assert image_variants.parse_variant({'w': '100'}) == 'thumb'
+    assert image_variants.parse_variant({'w': '300'}) == 'card'
+    assert image_variants.parse_variant({'w': '9999'}) == 'full'
+    for args in ({'size': 'huge'}, {'w': 'wide'}):
+        with pytest.raises(ValueError):
+            image_variants.parse_variant(args)
+
+def test_render_variant_fits_the_longest_edge():
+    rendered = image_variants.render_variant(_jpeg(1200, 600), 480)
+    with Image.open(io.BytesIO(rendered)) as image:
+        assert image.size == (480, 240)
+        assert image.format == image_variants.output_format()[0]
+
+def test_generate_variants_stores_smaller_renditions(tmp_path):
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient().db
+    store = LocalStore(str(tmp_path))
+    digest = store_image(store, _jpeg(1000, 800))
+
+    variants = image_variants.generate_variants(db, store, digest)
+
+    assert set(variants) == set(image_variants.VARIANTS)
+    sizes = {name: len(store.get(variant)[0]) for name, variant in variants.items()}
+    assert sizes['thumb'] < sizes['card'] < len(store.get(digest)[0])
+    assert db.image_variants.find_one({'_id': digest})['variants'] == variants
+
+def test_failed_render_is_recorded_and_not_requeued(tmp_path):
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient().db
+    store = LocalStore(str(tmp_path))
+    digest = store_image(store, b'\xff\xd8\xff' + b'\x00' * 64)  # JPEG signature, undecodable body
+    worker = image_variants.VariantWorker(db, store, max_workers=1)
+
+    worker.submit(digest).result()
+
+    assert db.image_variants.find_one({'_id': digest})['failed'] is True
+    assert worker.lookup(digest) == {}
+    assert worker.submit(digest) is None
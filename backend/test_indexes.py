@@ -0,0 +1,59 @@
+"""
+Tests for the declared indexes and query-shape coverage report
+"""
+
+from datetime import datetime
+
+import pytest
+from pymongo import ASCENDING, DESCENDING
+
+import indexes
+
+def test_declared_indexes_cover_every_query_shape():
+    assert indexes.uncovered_shapes(indexes.declared_index_keys()) == []
+
+def test_equality_fields_match_in_any_order():
+    keys = [('vendor_id', ASCENDING), ('status', ASCENDING)]
+    assert indexes.covers(keys, ('status', 'vendor_id'), None)
+
+def test_range_field_must_follow_equality_prefix():
+    keys = [('vendor_id', ASCENDING), ('createdAt', ASCENDING)]
+    assert indexes.covers(keys, ('vendor_id',), 'createdAt')
+    assert not indexes.covers(keys, ('vendor_id',), 'status')
+    assert not indexes.covers([('createdAt', DESCENDING)], ('vendor_id',), 'createdAt')
+
+def test_missing_index_is_reported():
+    live = {'orders': [[('_id', ASCENDING)]]}
+    shapes = [('orders', ('vendor_id',), 'createdAt'), ('orders', ('_id', 'vendor_id'), None)]
+    assert indexes.uncovered_shapes(live, shapes) == [('orders', ('vendor_id',), 'createdAt')]
+
+@pytest.fixture
+def db():
+    mongomock = pytest.importorskip('mongomock')
+    db = mongomock.MongoClient().db
+    db.vendors.insert_many([
+        {'_id': 'a1', 'clerk_user_id': 'user_a', 'createdAt': datetime(2026, 1, 1)},
+        {'_id': 'a2', 'clerk_user_id': 'user_a', 'createdAt': datetime(2026, 1, 2)},
+        {'_id': 'b1', 'clerk_user_id': 'user_b', 'createdAt': datetime(2026, 1, 1)},
+    ])
+    return db
+
+def test_one_failing_collection_does_not_stop_the_rest(db):
+    failures = indexes.ensure_indexes(db)
+    assert list(failures) == ['vendors']
+    assert len(db.orders.index_information()) == 1 + len(indexes.INDEXES['orders'])
+    assert len(db.dish_daily_stats.index_information()) == 2
+
+def test_dedupe_keeps_the_vendor_that_owns_data(db):
+    db.orders.insert_one({'vendor_id': 'a2'})
+    assert indexes.duplicate_vendors(db) == {'user_a': ['a1', 'a2']}
+
+    assert indexes.dedupe_vendors(db) == {}
+
+    assert sorted(vendor['_id'] for vendor in db.vendors.find()) == ['a2', 'b1']
+    assert indexes.ensure_indexes(db) == {}
+
+def test_dedupe_reports_vendors_that_both_own_data(db):
+    db.menus.insert_many([{'vendor_id': 'a1'}, {'vendor_id': 'a2'}])
+    assert indexes.dedupe_vendors(db) == {'user_a': ['a1', 'a2']}
+    assert db.vendors.count_documents({}) == 3
@@ -0,0 +1,52 @@
+"""
+Tests for the MongoDB-aware JSON provider
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from bson import Decimal128, ObjectId
+from flask import Flask, jsonify
+
+import json_provider
+from json_provider import MongoJSONProvider
+
+ORDER_ID = ObjectId('65f1c0ffee0000000000abcd')
+STAFF_ID = ObjectId('65f1c0ffee0000000000beef')
+DOC = {
+    '_id': ORDER_ID,
+    'createdAt': datetime(2026, 3, 1, 12, 30, 5, 123000),
+    'totalAmount': Decimal128('249.50'),
+    'tip': Decimal('10.5'),
+    'assignedTo': {'_id': STAFF_ID, 'orders': [ORDER_ID]},
+}
+EXPECTED = {
+    '_id': str(ORDER_ID),
+    'createdAt': '2026-03-01T12:30:05.123000+00:00',
+    'totalAmount': 249.5,
+    'tip': 10.5,
+    'assignedTo': {'_id': str(STAFF_ID), 'orders': [str(ORDER_ID)]},
+}
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = MongoJSONProvider(app)
+    return app
+
+def test_jsonify_encodes_nested_bson_types(app):
+    with app.app_context():
+        response = jsonify(DOC)
+    assert json.loads(response.get_data()) == EXPECTED
+    assert DOC['_id'] == ORDER_ID
+
+def test_stdlib_fallback_matches_orjson(app, monkeypatch):
+    fast = app.json.dumps(DOC)
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    assert json.loads(app.json.dumps(DOC)) == json.loads(fast) == EXPECTED
+
+def test_unknown_types_still_fail(app):
+    with pytest.raises(TypeError):
+        app.json.dumps({'value': object()})
@@ -0,0 +1,50 @@
+"""
+Tests for CSV menu import validation and batching
+"""
+
+import io
+
+import pytest
+
+from menu_import import import_menus, iter_csv_rows, validate_row
+
+mongomock = pytest.importorskip('mongomock')
+
+def _rows(text):
+    return iter_csv_rows(io.BytesIO(text.encode('utf-8-sig')))
+
+def test_validate_row_normalises_cells():
+    data = validate_row({'name': ' Idli ', 'price': '40', 'mealType': 'Breakfast', 'isPublished': 'yes'})
+    assert data['name'] == 'Idli'
+    assert data['price'] == 40.0
+    assert data['mealType'] == 'breakfast'
+    assert data['isPublished'] is True
+    assert data['availability'] == 'daily'
+
+@pytest.mark.parametrize('values', [
+    {'name': ''},
+    {'name': 'Dosa', 'price': 'cheap'},
+    {'name': 'Dosa', 'price': '-1'},
+    {'name': 'Dosa', 'mealType': 'brunch'},
+    {'name': 'Dosa', 'isPublished': 'maybe'},
+    {'name': 'Dosa', 'startDate': '2026-13-01'},
+])
+def test_validate_row_rejects_bad_cells(values):
+    with pytest.raises(ValueError):
+        validate_row(values)
+
+def test_import_batches_rows_and_reports_errors_by_row():
+    menus = mongomock.MongoClient().db.menus
+    csv_text = 'Name,Price,Meal Type,Notes\n' + ''.join(f'Dish {i},{i},lunch,x\n' for i in range(7))
+    csv_text += 'Broken,abc,lunch,x\n\n'
+
+    report = import_menus(menus, 'v1', _rows(csv_text), batch_size=3)
+
+    assert report['imported'] == 7
+    assert report['errors'] == [{'row': 9, 'error': 'price must be a number'}]
+    assert report['ignoredColumns'] == ['Notes']
+    assert menus.count_documents({'vendor_id': 'v1', 'mealType': 'lunch'}) == 7
+
+def test_header_without_name_column_is_rejected():
+    with pytest.raises(ValueError):
+        import_menus(mongomock.MongoClient().db.menus, 'v1', _rows('price\n1\n'))
@@ -0,0 +1,59 @@
+"""
+Tests for order flattening and the streamed export encodings
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from order_export import COLUMNS, export_body, order_lines, parse_export_args
+
+ORDERS = [
+    {'_id': 'o1', 'createdAt': datetime(2026, 1, 5, 9, 30), 'status': 'delivered',
+     'customerName': 'Asha, K', 'totalAmount': 50,
+     'items': [{'name': 'Idli', 'quantity': 2, 'price': 10}, {'name': 'Vada', 'quantity': 1, 'price': 30}]},
+    {'_id': 'o2', 'createdAt': datetime(2026, 1, 6), 'status': 'pending', 'items': []},
+]
+
+def test_orders_flatten_to_one_line_per_item():
+    lines = list(order_lines(ORDERS))
+    assert [(line['orderId'], line['itemName'], line['lineTotal']) for line in lines] == [
+        ('o1', 'Idli', 20), ('o1', 'Vada', 30), ('o2', None, None)
+    ]
+    assert lines[0]['createdAt'] == '2026-01-05T09:30:00'
+
+def test_csv_export_quotes_cells_and_gzips_to_the_same_text():
+    plain = b''.join(export_body(iter(ORDERS), 'csv'))
+    rows = list(csv.reader(io.StringIO(plain.decode())))
+    assert rows[0] == COLUMNS
+    assert rows[1][3] == 'Asha, K'
+    assert len(rows) == 4
+
+    compressed = b''.join(export_body(iter(ORDERS), 'csv', compress=True))
+    assert gzip.decompress(compressed) == plain
+
+def test_csv_export_neutralizes_formulas_in_customer_text():
+    order = {'_id': 'o3', 'createdAt': datetime(2026, 1, 7), 'status': 'pending',
+             'customerName': '=HYPERLINK("http://evil.example","Refund")', 'deliveryAddress': '@SUM(A1)',
+             'totalAmount': -5, 'items': [{'name': '+cmd', 'quantity': 1, 'price': -5}]}
+    rows = list(csv.reader(io.StringIO(b''.join(export_body(iter([order]), 'csv')).decode())))
+    row = dict(zip(COLUMNS, rows[1]))
+    assert row['customerName'] == '\'=HYPERLINK("http://evil.example","Refund")'
+    assert row['deliveryAddress'] == "'@SUM(A1)"
+    assert row['itemName'] == "'+cmd"
+    # Numbers are not text, so negative amounts stay numeric
+    assert row['totalAmount'] == '-5' and row['lineTotal'] == '-5'
+
+def test_ndjson_export_has_one_object_per_line():
+    text = b''.join(export_body(iter(ORDERS), 'ndjson')).decode()
+    assert [json.loads(line)['itemName'] for line in text.splitlines()] == ['Idli', 'Vada', None]
+
+@pytest.mark.parametrize('args', [{}, {'from': '2026-01-01', 'format': 'xml'},
+                                  {'from': '2026-01-01', 'format': 'parquet', 'gzip': '1'}])
+def test_invalid_export_arguments(args):
+    with pytest.raises(ValueError):
+        parse_export_args(args)
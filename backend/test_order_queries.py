@@ -0,0 +1,21 @@
+"""
+Tests for order list filters
+"""
+
+from datetime import datetime
+
+import pytest
+
+from order_queries import order_filter
+
+def test_bare_dates_are_read_in_the_vendor_timezone():
+    query = order_filter('v1', {'from': '2026-03-02', 'to': '2026-03-02'}, 'Asia/Kolkata')
+    assert query['createdAt'] == {'$gte': datetime(2026, 3, 1, 18, 30), '$lt': datetime(2026, 3, 2, 18, 30)}
+
+def test_offset_qualified_bounds_are_converted_to_utc():
+    query = order_filter('v1', {'from': '2026-03-02T00:00:00+05:30', 'to': '2026-03-02T12:00:00'})
+    assert query['createdAt'] == {'$gte': datetime(2026, 3, 1, 18, 30), '$lte': datetime(2026, 3, 2, 12, 0)}
+
+def test_unknown_timezone_is_rejected():
+    with pytest.raises(ValueError):
+        order_filter('v1', {'from': '2026-03-02'}, 'Mars/Olympus')
@@ -0,0 +1,28 @@
+"""
+Tests for ?fields= parsing into MongoDB projections
+"""
+
+import pytest
+
+from projections import DEFAULT_FIELDS, parse_fields
+
+def test_default_projection_is_the_lean_list_view():
+    assert parse_fields({}, 'menus') == dict.fromkeys(DEFAULT_FIELDS['menus'], 1)
+    assert 'loginPassword' not in parse_fields({}, 'staff')
+
+def test_requested_fields_plus_required_ones():
+    assert parse_fields({'fields': 'status, totalAmount'}, 'orders', required=('createdAt',)) == {
+        'status': 1, 'totalAmount': 1, 'createdAt': 1
+    }
+
+def test_star_returns_everything_but_hidden_fields():
+    assert parse_fields({'fields': '*'}, 'menus') is None
+    assert parse_fields({'fields': '*'}, 'staff') == {'loginPassword': 0}
+
+def test_sub_paths_of_a_requested_path_are_dropped():
+    assert parse_fields({'fields': 'items.name,items'}, 'orders') == {'items': 1}
+
+def test_hidden_and_malformed_fields_are_rejected():
+    for fields in ('loginPassword', 'loginPassword.hash', '$where', 'a..b'):
+        with pytest.raises(ValueError):
+            parse_fields({'fields': fields}, 'staff')
@@ -0,0 +1,38 @@
+"""
+Tests for the streamed list encodings and format negotiation
+"""
+
+import json
+
+from bson import ObjectId
+from flask import Flask, request
+
+from json_provider import MongoJSONProvider
+from streaming import iter_json_array, iter_ndjson, stream_format
+
+app = Flask(__name__)
+dumps = MongoJSONProvider(app).dumps
+IDS = [ObjectId() for _ in range(3)]
+
+def _docs(count):
+    return [{'_id': IDS[i], 'name': f'dish {i}'} for i in range(count)]
+
+def test_json_array_is_valid_for_any_length():
+    for count in (0, 1, 3):
+        body = ''.join(iter_json_array(_docs(count), dumps))
+        assert json.loads(body) == [{'_id': str(IDS[i]), 'name': f'dish {i}'} for i in range(count)]
+
+def test_ndjson_writes_one_document_per_line():
+    lines = ''.join(iter_ndjson(_docs(3), dumps)).splitlines()
+    assert [json.loads(line)['_id'] for line in lines] == [str(_id) for _id in IDS]
+
+def test_format_follows_accept_header_and_stream_flag():
+    cases = [
+        ({'Accept': 'application/x-ndjson'}, '', 'ndjson'),
+        ({'Accept': 'application/json, text/plain, */*'}, '', None),
+        ({'Accept': 'application/json'}, '?stream=1', 'json'),
+        ({}, '', None),
+    ]
+    for headers, query, expected in cases:
+        with app.test_request_context('/api/menus' + query, headers=headers):
+            assert stream_format(request) == expected
@@ -0,0 +1,60 @@
+"""
+Tests for delta sync and deletion tombstones
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from sync import parse_since, record_deletion, sync
+
+mongomock = pytest.importorskip('mongomock')
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.menus.insert_many([
+        {'vendor_id': 'v1', 'name': 'old', 'updatedAt': NOW - timedelta(hours=2)},
+        {'vendor_id': 'v1', 'name': 'new', 'updatedAt': NOW - timedelta(minutes=1)},
+        {'vendor_id': 'v2', 'name': 'other', 'updatedAt': NOW - timedelta(minutes=1)},
+    ])
+    return db
+
+def test_full_sync_returns_every_document_of_the_vendor(db):
+    result = sync(db, 'v1', ['menus'], now=NOW)
+    assert result['full'] and not result['hasMore']
+    assert [menu['name'] for menu in result['changes']['menus']] == ['old', 'new']
+
+def test_delta_returns_changes_and_tombstones_since(db):
+    record_deletion(db, 'v1', 'menus', ['deleted-id'])
+    since = NOW - timedelta(hours=1)
+
+    result = sync(db, 'v1', ['menus', 'staff'], since=since, now=NOW)
+
+    assert [menu['name'] for menu in result['changes']['menus']] == ['new']
+    assert result['deleted'] == {'menus': ['deleted-id'], 'staff': []}
+    assert parse_since(result['syncToken']) < NOW
+
+def test_since_older_than_the_tombstone_log_forces_a_full_sync(db):
+    result = sync(db, 'v1', ['menus'], since=NOW - timedelta(days=365), now=NOW)
+    assert result['reset'] and result['full']
+    assert len(result['changes']['menus']) == 2
+
+def test_truncated_sync_resumes_from_the_last_document(db):
+    first = sync(db, 'v1', ['menus'], now=NOW, limit=1)
+    assert first['hasMore']
+    second = sync(db, 'v1', ['menus'], since=parse_since(first['syncToken']), now=NOW, limit=1)
+    assert [menu['name'] for menu in second['changes']['menus']] == ['new']
+
+def test_truncation_never_splits_a_millisecond(db):
+    db.menus.insert_many([{'vendor_id': 'v3', 'name': str(i), 'updatedAt': NOW} for i in range(3)])
+    result = sync(db, 'v3', ['menus'], now=NOW + timedelta(hours=1), limit=1)
+    assert len(result['changes']['menus']) == 3
+    assert parse_since(result['syncToken']) > NOW
+
+def test_since_accepts_utc_offsets():
+    assert parse_since('2026-03-01T12:00:00+05:30') == datetime(2026, 3, 1, 6, 30)
+    with pytest.raises(ValueError):
+        parse_since('yesterday')
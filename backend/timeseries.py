@@ -0,0 +1,207 @@
+"""
+Time-bucketed analytics for the Vendor Operations Dashboard
+Buckets order metrics by hour/day/week/month in the vendor's timezone, either
+from the daily_rollups collection or with one server-side $dateTrunc pipeline;
+?exact=1 forces the pipeline so unique customers are counted exactly
+"""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import hyperloglog
+from daily_rollups import DATE_FORMAT, daily_series, daily_sketches
+
+METRICS = ('revenue', 'orders', 'items', 'customers')
+GRANULARITIES = ('hour', 'day', 'week', 'month')
+MAX_BUCKETS = 2000
+
+# Range covered when ?from= is omitted
+DEFAULT_SPAN = {
+    'hour': timedelta(hours=23),
+    'day': timedelta(days=6),
+    'week': timedelta(weeks=11),
+    'month': timedelta(days=334)
+}
+
+# Metrics the daily rollups carry; customers come from merged daily sketches
+ROLLUP_METRICS = ('revenue', 'orders', 'items', 'customers')
+
+def get_zone(name):
+    """Resolve an IANA timezone name, raising ValueError for unknown ones"""
+    try:
+        return ZoneInfo(name or 'UTC')
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown timezone: {name}')
+
+def _to_utc(local):
+    return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+def truncate(value, granularity, zone):
+    """Truncate an aware local datetime to the start of its bucket"""
+    value = value.astimezone(zone)
+    if granularity == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    start = datetime(value.year, value.month, value.day, tzinfo=zone)
+    if granularity == 'week':
+        start -= timedelta(days=start.weekday())
+    elif granularity == 'month':
+        start = start.replace(day=1)
+    return start
+
+def next_bucket(start, granularity, zone):
+    """Return the start of the bucket following start"""
+    if granularity == 'hour':
+        return (start.astimezone(timezone.utc) + timedelta(hours=1)).astimezone(zone)
+    if granularity == 'day':
+        naive = start.replace(tzinfo=None) + timedelta(days=1)
+    elif granularity == 'week':
+        naive = start.replace(tzinfo=None) + timedelta(days=7)
+    else:
+        year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
+        naive = start.replace(tzinfo=None, year=year, month=month)
+    # Re-attach the zone so DST changes land on local midnight
+    return naive.replace(tzinfo=zone)
+
+def bucket_starts(start, end, granularity, zone):
+    """Every bucket start from the one containing start to the one containing end"""
+    current = truncate(start, granularity, zone)
+    last = truncate(end, granularity, zone)
+    buckets = []
+    while current <= last:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f'Range produces more than {MAX_BUCKETS} buckets')
+        current = next_bucket(current, granularity, zone)
+    return buckets
+
+def _parse_bound(value, zone, end_of_day):
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=zone)
+    if end_of_day and len(value) == 10:
+        # A bare date as the upper bound covers the whole day
+        parsed = parsed + timedelta(days=1) - timedelta(microseconds=1)
+    return parsed
+
+def parse_query(args, default_timezone='UTC', now=None):
+    """Validate the query string of /api/dashboard/timeseries"""
+    metric = args.get('metric', 'revenue')
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    granularity = args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    tz_name = args.get('tz') or default_timezone or 'UTC'
+    zone = get_zone(tz_name)
+    now = (now or datetime.now(timezone.utc)).astimezone(zone)
+
+    end = _parse_bound(args['to'], zone, True) if args.get('to') else now
+    start = (_parse_bound(args['from'], zone, False) if args.get('from')
+             else truncate(end - DEFAULT_SPAN[granularity], granularity, zone))
+    if start > end:
+        raise ValueError('from must not be after to')
+
+    # Whole local days can be answered from the daily rollups
+    day_aligned = (start == truncate(start, 'day', zone) and
+                   (not args.get('to') or len(args['to']) == 10))
+
+    return {
+        'metric': metric,
+        'granularity': granularity,
+        'timezone': tz_name,
+        'zone': zone,
+        'start': start,
+        'end': end,
+        'day_aligned': day_aligned,
+        'exact': args.get('exact') in ('1', 'true')
+    }
+
+def _metric_group(metric):
+    if metric == 'revenue':
+        return {'$sum': '$totalAmount'}
+    if metric == 'orders':
+        return {'$sum': 1}
+    if metric == 'items':
+        return {'$sum': {'$sum': '$items.quantity'}}
+    return {'$addToSet': '$customerEmail'}
+
+def timeseries_pipeline(vendor_id, metrics, granularity, tz_name, start_utc, end_utc):
+    """Build the $dateTrunc aggregation over raw orders, one sum per metric"""
+    trunc = {'date': '$createdAt', 'unit': granularity, 'timezone': tz_name}
+    if granularity == 'week':
+        trunc['startOfWeek'] = 'monday'
+
+    pipeline = [
+        {'$match': {'vendor_id': vendor_id, 'createdAt': {'$gte': start_utc, '$lte': end_utc}}},
+        {'$group': {'_id': {'$dateTrunc': trunc}, **{metric: _metric_group(metric) for metric in metrics}}}
+    ]
+    if 'customers' in metrics:
+        pipeline.append({'$addFields': {'customers': {'$size': '$customers'}}})
+    return pipeline
+
+def _rollups_usable(query, metrics):
+    # Rollups are cut at UTC midnight, so they only answer UTC day-or-coarser queries
+    return (all(metric in ROLLUP_METRICS for metric in metrics) and
+            not query['exact'] and
+            query['granularity'] != 'hour' and
+            query['day_aligned'] and
+            query['zone'].utcoffset(datetime(2000, 1, 1)) == timedelta(0) and
+            query['zone'].utcoffset(datetime(2000, 7, 1)) == timedelta(0))
+
+def bucket_totals(db, vendor_id, query, metrics):
+    """Return (source, [(bucket start, {metric: value})]) for a parsed query
+
+    Every metric comes from the same single read of the rollups or raw orders
+    """
+    zone = query['zone']
+    granularity = query['granularity']
+    buckets = bucket_starts(query['start'], query['end'], granularity, zone)
+    totals = {}
+
+    if _rollups_usable(query, metrics):
+        source = 'rollups'
+        summed = [metric for metric in metrics if metric != 'customers']
+        last_day = _to_utc(truncate(query['end'], 'day', zone))
+        if summed:
+            for day in daily_series(db, vendor_id, _to_utc(query['start']), last_day, summed):
+                day_start = datetime.strptime(day['date'], DATE_FORMAT).replace(tzinfo=zone)
+                bucket = totals.setdefault(_to_utc(truncate(day_start, granularity, zone)), {})
+                for metric in summed:
+                    bucket[metric] = bucket.get(metric, 0) + day[metric]
+        if 'customers' in metrics:
+            sketches = {}
+            days = daily_sketches(db, vendor_id, _to_utc(query['start']), last_day)
+            for day, sketch in days.items():
+                key = _to_utc(truncate(day.replace(tzinfo=zone), granularity, zone))
+                sketches[key] = hyperloglog.merge(sketches.get(key, {}), sketch)
+            for key, sketch in sketches.items():
+                totals.setdefault(key, {})['customers'] = hyperloglog.estimate(sketch)
+    else:
+        source = 'orders'
+        pipeline = timeseries_pipeline(vendor_id, metrics, granularity, query['timezone'],
+                                       _to_utc(query['start']), _to_utc(query['end']))
+        for row in db.orders.aggregate(pipeline):
+            totals[row['_id'].replace(tzinfo=None)] = row
+
+    series = []
+    for bucket in buckets:
+        row = totals.get(_to_utc(bucket), {})
+        series.append((bucket, {metric: round(row.get(metric, 0), 2) if metric == 'revenue'
+                                else row.get(metric, 0) for metric in metrics}))
+    return source, series
+
+def compute_timeseries(db, vendor_id, query):
+    """Return gap-filled buckets for a parsed query"""
+    metric = query['metric']
+    source, series = bucket_totals(db, vendor_id, query, [metric])
+
+    return {
+        'metric': metric,
+        'granularity': query['granularity'],
+        'timezone': query['timezone'],
+        'from': query['start'].isoformat(),
+        'to': query['end'].isoformat(),
+        'source': source,
+        'buckets': [{'bucket': bucket.isoformat(), 'value': values[metric]} for bucket, values in series]
+    }
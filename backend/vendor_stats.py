@@ -0,0 +1,162 @@
+"""
+Materialized per-vendor order counters for the Vendor Operations Dashboard
+One vendor_stats document per vendor holds the running order totals, kept
+current with atomic $inc updates as orders are written, plus a HyperLogLog
+sketch of customer emails for the unique-customer count
+
+Usage: python vendor_stats.py rebuild [vendor_id]
+       python vendor_stats.py check [vendor_id]
+"""
+
+import sys
+from datetime import datetime
+
+import hyperloglog
+
+PENDING_STATUSES = ['pending', 'confirmed', 'preparing', 'ready', 'out_for_delivery']
+COMPLETED_STATUS = 'delivered'
+
+def _status_key(status):
+    # Field names may not contain dots or start with $
+    return str(status or 'unknown').replace('.', '_').lstrip('$')
+
+def record_order_created(db, order):
+    """Count a freshly inserted order; rebuilds the vendor if it has no counters yet"""
+    update = {
+        '$inc': {
+            'totalOrders': 1,
+            'totalRevenue': order.get('totalAmount', 0) or 0,
+            f"statusCounts.{_status_key(order.get('status'))}": 1
+        },
+        '$set': {'updatedAt': datetime.utcnow()}
+    }
+    if order.get('customerEmail') is not None:
+        update['$max'] = hyperloglog.max_update('customersHll', order['customerEmail'])
+    result = db.vendor_stats.update_one({'_id': order['vendor_id']}, update)
+    if result.matched_count == 0:
+        # The order is already in the collection, so the rebuild includes it
+        rebuild_vendor_stats(db, order['vendor_id'])
+
+def record_order_status_change(db, vendor_id, old_status, new_status):
+    """Move one order between status counters"""
+    if old_status == new_status:
+        return
+    result = db.vendor_stats.update_one(
+        {'_id': vendor_id},
+        {
+            '$inc': {
+                f'statusCounts.{_status_key(old_status)}': -1,
+                f'statusCounts.{_status_key(new_status)}': 1
+            },
+            '$set': {'updatedAt': datetime.utcnow()}
+        }
+    )
+    if result.matched_count == 0:
+        rebuild_vendor_stats(db, vendor_id)
+
+def compute_vendor_stats(db, vendor_id=None):
+    """Recompute the counters from the raw orders collection"""
+    pipeline = []
+    if vendor_id is not None:
+        pipeline.append({'$match': {'vendor_id': vendor_id}})
+    pipeline.append({
+        '$group': {
+            '_id': {'vendor_id': '$vendor_id', 'status': '$status'},
+            'orders': {'$sum': 1},
+            'revenue': {'$sum': '$totalAmount'}
+        }
+    })
+
+    stats = {}
+    for row in db.orders.aggregate(pipeline):
+        vid = row['_id']['vendor_id']
+        doc = stats.setdefault(vid, {'totalOrders': 0, 'totalRevenue': 0, 'statusCounts': {}})
+        doc['totalOrders'] += row['orders']
+        doc['totalRevenue'] += row['revenue']
+        key = _status_key(row['_id'].get('status'))
+        doc['statusCounts'][key] = doc['statusCounts'].get(key, 0) + row['orders']
+
+    if vendor_id is not None and vendor_id not in stats:
+        stats[vendor_id] = {'totalOrders': 0, 'totalRevenue': 0, 'statusCounts': {}}
+    return stats
+
+def compute_customer_sketches(db, vendor_id=None):
+    """Build each vendor's customer sketch by streaming its distinct emails"""
+    pipeline = []
+    if vendor_id is not None:
+        pipeline.append({'$match': {'vendor_id': vendor_id}})
+    pipeline += [
+        {'$match': {'customerEmail': {'$ne': None}}},
+        {'$group': {'_id': {'vendor_id': '$vendor_id', 'email': '$customerEmail'}}}
+    ]
+
+    sketches = {}
+    for row in db.orders.aggregate(pipeline, allowDiskUse=True):
+        hyperloglog.add(sketches.setdefault(row['_id']['vendor_id'], {}), row['_id']['email'])
+    return sketches
+
+def rebuild_vendor_stats(db, vendor_id=None):
+    """Overwrite stored counters with freshly computed ones; returns vendors rebuilt"""
+    stats = compute_vendor_stats(db, vendor_id)
+    sketches = compute_customer_sketches(db, vendor_id)
+    now = datetime.utcnow()
+    for vid, doc in stats.items():
+        sketch = hyperloglog.to_document(sketches.get(vid, {}))
+        db.vendor_stats.update_one(
+            {'_id': vid},
+            {'$set': {**doc, 'customersHll': sketch, 'updatedAt': now, 'rebuiltAt': now}},
+            upsert=True
+        )
+    return len(stats)
+
+def find_drift(db, vendor_id=None):
+    """Compare stored counters against the orders collection"""
+    drift = {}
+    for vid, expected in compute_vendor_stats(db, vendor_id).items():
+        stored = db.vendor_stats.find_one({'_id': vid}) or {}
+        stored_counts = {k: v for k, v in stored.get('statusCounts', {}).items() if v}
+        if (stored.get('totalOrders') != expected['totalOrders'] or
+                round(stored.get('totalRevenue', 0), 2) != round(expected['totalRevenue'], 2) or
+                stored_counts != expected['statusCounts']):
+            drift[vid] = {'stored': stored, 'expected': expected}
+    return drift
+
+def get_vendor_counters(db, vendor_id):
+    """Return the dashboard counters for a vendor from its stats document"""
+    doc = db.vendor_stats.find_one({'_id': vendor_id})
+    if doc is None or 'customersHll' not in doc:
+        rebuild_vendor_stats(db, vendor_id)
+        doc = db.vendor_stats.find_one({'_id': vendor_id}) or {}
+
+    status_counts = doc.get('statusCounts', {})
+    return {
+        'totalOrders': doc.get('totalOrders', 0),
+        'totalRevenue': doc.get('totalRevenue', 0),
+        'totalCustomers': hyperloglog.estimate(hyperloglog.from_document(doc.get('customersHll'))),
+        'pendingOrders': sum(status_counts.get(status, 0) for status in PENDING_STATUSES),
+        'completedOrders': status_counts.get(COMPLETED_STATUS, 0)
+    }
+
+def main():
+    from app import mongo
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ('rebuild', 'check'):
+        print(__doc__)
+        sys.exit(1)
+    if not mongo:
+        print("MongoDB not connected!")
+        sys.exit(1)
+
+    vendor_id = sys.argv[2] if len(sys.argv) > 2 else None
+    if sys.argv[1] == 'rebuild':
+        count = rebuild_vendor_stats(mongo.db, vendor_id)
+        print(f"Rebuilt counters for {count} vendor(s)")
+    else:
+        drift = find_drift(mongo.db, vendor_id)
+        for vid, info in drift.items():
+            print(f"{vid}: stored={info['stored']} expected={info['expected']}")
+        print(f"{len(drift)} vendor(s) drifted")
+        sys.exit(1 if drift else 0)
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,7 @@ import { useAuth } from '@clerk/clerk-react'
 import api from '../utils/api'
 import { Plus, Edit, Trash2, Eye, EyeOff, Calendar, Image as ImageIcon, Loader } from 'lucide-react'
 import toast from 'react-hot-toast'
-import { validateImageFile, convertToBase64, createImagePreview, cleanupImagePreview } from '../utils/imageUpload'
+import { validateImageFile, convertToBase64, createImagePreview, cleanupImagePreview, resolveImageUrl } from '../utils/imageUpload'
 
 const MenuManagement = () => {
   const { getToken } = useAuth()
@@ -132,7 +132,7 @@ const MenuManagement = () => {
       isPublished: menu.isPublished,
       imageUrl: menu.imageUrl || ''
     })
-    setImagePreview(menu.imageUrl || '')
+    setImagePreview(resolveImageUrl(menu.imageUrl, 'card') || '')
     setShowModal(true)
   }
 
@@ -259,7 +259,7 @@ const MenuManagement = () => {
                 {menu.imageUrl && (
                   <div className="mb-4 rounded-lg overflow-hidden">
                     <img 
-                      src={menu.imageUrl} 
+                      src={resolveImageUrl(menu.imageUrl, 'card')} 
                       alt={menu.name}
                       className="w-full h-48 object-cover hover:scale-105 transition-transform duration-300"
                       onError={(e) => {
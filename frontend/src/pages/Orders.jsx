@@ -12,6 +12,8 @@ const Orders = () => {
   const [statusFilter, setStatusFilter] = useState('all')
   const [dateFilter, setDateFilter] = useState('all')
   const [selectedOrder, setSelectedOrder] = useState(null)
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [showModal, setShowModal] = useState(false)
 
   const statusOptions = [
@@ -63,24 +65,38 @@ const Orders = () => {
     fetchOrders()
   }, [statusFilter, dateFilter])
 
-  const fetchOrders = async () => {
+  // Local YYYY-MM-DD of the first day covered by the date filter
+  const dateFrom = (filter) => {
+    const start = new Date()
+    if (filter === 'week') start.setDate(start.getDate() - start.getDay())
+    if (filter === 'month') start.setDate(1)
+    const pad = (n) => String(n).padStart(2, '0')
+    return `${start.getFullYear()}-${pad(start.getMonth() + 1)}-${pad(start.getDate())}`
+  }
+
+  // Without a cursor the list is replaced; with one the next page is appended
+  const fetchOrders = async (cursor = null) => {
     try {
+      if (cursor) setLoadingMore(true)
       const token = await getToken()
       const params = new URLSearchParams()
       
       if (statusFilter !== 'all') params.append('status', statusFilter)
-      if (dateFilter !== 'all') params.append('date', dateFilter)
-      if (searchTerm) params.append('search', searchTerm)
+      if (dateFilter !== 'all') params.append('from', dateFrom(dateFilter))
+      if (searchTerm.trim()) params.append('customer', searchTerm.trim())
+      if (cursor) params.append('cursor', cursor)
 
       const response = await api.get(`/orders?${params}`, {
         headers: { Authorization: `Bearer ${token}` }
       })
-      setOrders(response.data)
+      setOrders(previous => cursor ? [...previous, ...response.data.orders] : response.data.orders)
+      setNextCursor(response.data.nextCursor)
     } catch (error) {
       console.error('Error fetching orders:', error)
       toast.error('Failed to fetch orders')
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -148,9 +164,10 @@ const Orders = () => {
             <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-gray-400 h-4 w-4" />
             <input
               type="text"
-              placeholder="Search orders..."
+              placeholder="Customer name or email..."
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
+              onKeyDown={(e) => e.key === 'Enter' && fetchOrders()}
               className="input-field pl-10"
             />
           </div>
@@ -176,7 +193,7 @@ const Orders = () => {
           </select>
 
           <button
-            onClick={fetchOrders}
+            onClick={() => fetchOrders()}
             className="btn-primary flex items-center justify-center"
           >
             <Filter className="h-4 w-4 mr-2" />
@@ -249,6 +266,18 @@ const Orders = () => {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="mt-6 text-center">
+          <button
+            onClick={() => fetchOrders(nextCursor)}
+            disabled={loadingMore}
+            className="btn-secondary"
+          >
+            {loadingMore ? 'Loading...' : 'Load more orders'}
+          </button>
+        </div>
+      )}
+
       {/* Order Details Modal */}
       {showModal && selectedOrder && (
         <div className="fixed inset-0 bg-gray-600 bg-opacity-50 flex items-center justify-center z-50">
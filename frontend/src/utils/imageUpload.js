@@ -2,6 +2,22 @@
  * Image upload utilities for dish images
  */
 
+import { API_BASE_URL } from './api';
+
+/**
+ * Resolve a stored image URL for use in an <img> tag
+ * @param {string} imageUrl - Data URL, absolute URL or server path such as /api/images/<hash>
+ * @param {string} size - Optional server-rendered variant: 'thumb', 'card' or 'full'
+ * @returns {string} - URL the browser can load
+ */
+export const resolveImageUrl = (imageUrl, size) => {
+  if (!imageUrl || !imageUrl.startsWith('/api/')) {
+    return imageUrl;
+  }
+  const url = API_BASE_URL.replace(/\/api\/?$/, '') + imageUrl;
+  return size ? `${url}?size=${size}` : url;
+};
+
 /**
  * Validate uploaded image file
  * @param {File} file - The uploaded file